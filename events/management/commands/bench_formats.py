@@ -0,0 +1,66 @@
+import gzip
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from events.compression import BROTLI_QUALITY, HAS_BROTLI
+from events.renderers import (VisibilityArrowRenderer, VisibilityJSONRenderer,
+                              VisibilityMessagePackRenderer, _available)
+from integrations.models import SBO
+from integrations.sbdb_stub import synthetic_catalog
+from integrations.views import columns_to_rows, visibility_columns_for_many
+
+
+def synthetic_columns(objects, days, seed=0):
+    """Visibility columns of the synthetic catalog over `days` nights from Warsaw."""
+    from astropy.time import Time
+    import astropy.units as u
+
+    start = Time("2025-12-01 00:00:00")
+    return visibility_columns_for_many(synthetic_catalog(objects, seed), start, start + days * u.day,
+                                       observer_lat=52.23, observer_lon=21.01,
+                                       min_alt_deg=10.0, min_elong_deg=22.0)
+
+
+class Command(BaseCommand):
+    help = "Compare payload size and serialization time of the /events/ response formats."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--objects", type=int, default=2000)
+        parser.add_argument("--days", type=float, default=7.0)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        columns = synthetic_columns(options["objects"], options["days"])
+
+        def legacy_json():
+            # the pre-columnar path: SBO instances -> to_dict() -> JSON
+            rows = columns_to_rows(columns)
+            objs = [SBO(**row) for row in rows]
+            return JSONRenderer().render([obj.to_dict() for obj in objs])
+
+        json_renderer = VisibilityJSONRenderer()
+        formats = [
+            ("json (SBO.to_dict)", legacy_json),
+            ("json", lambda: json_renderer.render(columns)),
+            ("json + gzip", lambda: gzip.compress(json_renderer.render(columns), 6)),
+        ]
+        if HAS_BROTLI:
+            import brotli
+            formats.append(("json + br", lambda: brotli.compress(json_renderer.render(columns),
+                                                                  quality=BROTLI_QUALITY)))
+        if _available("msgpack"):
+            formats.append(("msgpack", lambda: VisibilityMessagePackRenderer().render(columns)))
+        if _available("pyarrow"):
+            formats.append(("arrow", lambda: VisibilityArrowRenderer().render(columns)))
+
+        self.stdout.write(f"{len(columns['name'])} windows, best of {options['repeat']}")
+        self.stdout.write(f"  {'format':<20} {'bytes':>12} {'ms':>10}")
+        for label, render in formats:
+            best = float("inf")
+            for _ in range(options["repeat"]):
+                t0 = time.perf_counter()
+                payload = render()
+                best = min(best, time.perf_counter() - t0)
+            self.stdout.write(f"  {label:<20} {len(payload):>12} {best * 1000:>10.1f}")
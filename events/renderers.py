@@ -0,0 +1,124 @@
+"""
+Renderers for the /events/ endpoint.
+
+events_view hands the renderers the columnar result of
+integrations.views.visibility_columns_for_many(); each renderer encodes it
+straight from the numpy arrays:
+
+- application/json (default): the historical list of SBO.to_dict() rows,
+- application/x-msgpack (?format=msgpack, needs `msgpack`): a map of column
+  arrays; `name` is an array of str, `latitude`/`longitude` are raw
+  little-endian float64 buffers (deg), `begin_time`/`end_time` raw
+  little-endian int64 buffers (ms since Unix epoch, UTC), `count` the row count,
+- application/vnd.apache.arrow.stream (?format=arrow, needs `pyarrow`): an
+  Arrow IPC stream with the same columns, times as timestamp[ms, UTC].
+
+Error payloads ({"detail": ...}) are passed through in each format.
+"""
+import importlib.util
+import json
+
+import numpy as np
+from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer, JSONRenderer
+
+from integrations.views import VISIBILITY_COLUMNS, columns_to_rows
+
+JD_UNIX_EPOCH = 2440587.5
+MS_PER_DAY = 86400000.0
+
+
+def is_columns(data):
+    return isinstance(data, dict) and all(key in data for key in VISIBILITY_COLUMNS)
+
+
+def jd_to_unix_ms(jd):
+    return np.rint((np.asarray(jd, dtype=np.float64) - JD_UNIX_EPOCH) * MS_PER_DAY).astype('<i8')
+
+
+class VisibilityJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if is_columns(data):
+            data = columns_to_rows(data)
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class VisibilityMessagePackRenderer(BaseRenderer):
+    media_type = 'application/x-msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        import msgpack
+        if is_columns(data):
+            data = {
+                "count": len(data["name"]),
+                "name": list(data["name"]),
+                "latitude": np.ascontiguousarray(data["latitude"], dtype='<f8').tobytes(),
+                "longitude": np.ascontiguousarray(data["longitude"], dtype='<f8').tobytes(),
+                "begin_time": jd_to_unix_ms(data["begin_jd"]).tobytes(),
+                "end_time": jd_to_unix_ms(data["end_jd"]).tobytes(),
+            }
+        return msgpack.packb(data, use_bin_type=True)
+
+
+class VisibilityArrowRenderer(BaseRenderer):
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        import pyarrow as pa
+        if is_columns(data):
+            timestamp = pa.timestamp('ms', tz='UTC')
+            table = pa.table({
+                "name": pa.array(data["name"], type=pa.string()),
+                "latitude": pa.array(np.asarray(data["latitude"], dtype=np.float64)),
+                "longitude": pa.array(np.asarray(data["longitude"], dtype=np.float64)),
+                "begin_time": pa.array(jd_to_unix_ms(data["begin_jd"]), type=timestamp),
+                "end_time": pa.array(jd_to_unix_ms(data["end_jd"]), type=timestamp),
+            })
+        else:
+            table = pa.table({key: [str(value)] for key, value in (data or {}).items()})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+
+def _available(module):
+    return importlib.util.find_spec(module) is not None
+
+
+# JSON first so that clients sending no (or */*) Accept header get the old format.
+VISIBILITY_RENDERERS = [VisibilityJSONRenderer]
+if _available('msgpack'):
+    VISIBILITY_RENDERERS.append(VisibilityMessagePackRenderer)
+if _available('pyarrow'):
+    VISIBILITY_RENDERERS.append(VisibilityArrowRenderer)
+VISIBILITY_RENDERERS.append(BrowsableAPIRenderer)
+
+
+# Track samples are rounded to ~0.004", well below the engine's accuracy.
+TRACK_DECIMALS = 6
+
+
+def stream_tracks_ndjson(times_jd, tracks):
+    """
+    Encode integrations.views.tracks_for_many() output as NDJSON, one line
+    at a time: first {"jd": [...]} with the full time grid, then one
+    {"name", "index", "ra", "dec", "alt"} line per object, where sample k
+    of the object is at jd[index[k]]. Tracks never carry NaN/inf (see
+    integrations.views._object_track); allow_nan=False keeps it valid JSON.
+    """
+    yield json.dumps({"jd": np.asarray(times_jd).tolist()}, allow_nan=False) + "\n"
+    for track in tracks:
+        yield json.dumps({
+            "name": track["name"],
+            "index": track["index"].tolist(),
+            "ra": np.round(track["ra"], TRACK_DECIMALS).tolist(),
+            "dec": np.round(track["dec"], TRACK_DECIMALS).tolist(),
+            "alt": np.round(track["alt"], TRACK_DECIMALS).tolist(),
+        }, allow_nan=False) + "\n"
@@ -1,3 +1,295 @@
-from django.test import TestCase
+import gzip
+import json
+from datetime import datetime, timezone
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from events.renderers import TRACK_DECIMALS, _available, stream_tracks_ndjson
+from events.tiles import (CACHE_ALIAS, TILE_SIZE, TileNotFound, cut_tile, get_tile, tile_bounds,
+                          tile_grid, tile_index, validate_tile)
+from events.views import TOO_LONG_RANGE
+from integrations.sbdb_stub import synthetic_catalog
+from integrations.views import columns_to_rows, visibility_columns_for_many
+
+LATITUDE, LONGITUDE = 52.23, 21.01
+QUERY = {"latitude": LATITUDE, "longitude": LONGITUDE,
+         "begin_time": "2025-12-01T16:00:00+00:00", "end_time": "2025-12-02T06:00:00+00:00"}
+NASA_ERROR = "Błąd podczas pobierania danych z modułu NASA."
+
+
+def iso_to_unix_ms(iso):
+    return datetime.fromisoformat(iso).replace(tzinfo=timezone.utc).timestamp() * 1000
+
+
+class AuthenticatedAPITestCase(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("observer", password="x"))
+
+
+class EventsFormatTests(AuthenticatedAPITestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.columns = visibility_columns_for_many(
+            synthetic_catalog(50), datetime.fromisoformat(QUERY["begin_time"]),
+            datetime.fromisoformat(QUERY["end_time"]), LATITUDE, LONGITUDE,
+            min_alt_deg=10.0, min_elong_deg=22.0)
+        cls.rows = columns_to_rows(cls.columns)
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch("events.views.get_query_sbo_columns", return_value=self.columns)
+        self.query = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, fmt=None, data=QUERY, **extra):
+        url = "/events/" if fmt is None else f"/events/?format={fmt}"
+        return self.client.post(url, data, format="json", **extra)
+
+    def test_json_rows(self):
+        self.assertGreater(len(self.rows), 0)
+        response = self.post()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), self.rows)
+
+    @skipUnless(_available("msgpack"), "msgpack is not installed")
+    def test_msgpack_matches_json_rows(self):
+        import msgpack
+        response = self.post("msgpack")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-msgpack")
+        payload = msgpack.unpackb(response.content, raw=False)
+
+        self.assertEqual(payload["count"], len(self.rows))
+        self.assertEqual(payload["name"], [row["name"] for row in self.rows])
+        for key in ("latitude", "longitude"):
+            self.assertEqual(np.frombuffer(payload[key], dtype="<f8").tolist(),
+                             [row[key] for row in self.rows])
+        for key in ("begin_time", "end_time"):
+            np.testing.assert_allclose(np.frombuffer(payload[key], dtype="<i8"),
+                                       [iso_to_unix_ms(row[key]) for row in self.rows], atol=1)
+
+    @skipUnless(_available("pyarrow"), "pyarrow is not installed")
+    def test_arrow_matches_json_rows(self):
+        import pyarrow as pa
+        response = self.post("arrow")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/vnd.apache.arrow.stream")
+        table = pa.ipc.open_stream(response.content).read_all()
+
+        self.assertEqual(table.column("name").to_pylist(), [row["name"] for row in self.rows])
+        for key in ("latitude", "longitude"):
+            self.assertEqual(table.column(key).to_pylist(), [row[key] for row in self.rows])
+        for key in ("begin_time", "end_time"):
+            got = [value.timestamp() * 1000 for value in table.column(key).to_pylist()]
+            np.testing.assert_allclose(got, [iso_to_unix_ms(row[key]) for row in self.rows],
+                                       atol=1)
+
+    def test_error_payload_json(self):
+        self.query.side_effect = RuntimeError("SBDB down")
+        response = self.post()
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(response.json(), {"detail": NASA_ERROR})
+
+    @skipUnless(_available("msgpack"), "msgpack is not installed")
+    def test_error_payload_msgpack(self):
+        import msgpack
+        self.query.side_effect = RuntimeError("SBDB down")
+        response = self.post("msgpack")
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(msgpack.unpackb(response.content, raw=False), {"detail": NASA_ERROR})
+
+        response = self.post("msgpack", data={"latitude": LATITUDE})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("begin_time", msgpack.unpackb(response.content, raw=False)["detail"])
+
+    @skipUnless(_available("pyarrow"), "pyarrow is not installed")
+    def test_error_payload_arrow(self):
+        import pyarrow as pa
+        self.query.side_effect = RuntimeError("SBDB down")
+        response = self.post("arrow")
+        self.assertEqual(response.status_code, 502)
+        table = pa.ipc.open_stream(response.content).read_all()
+        self.assertEqual(table.to_pylist(), [{"detail": NASA_ERROR}])
+
+    def test_gzip_when_accepted(self):
+        response = self.post(HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(json.loads(gzip.decompress(response.content)), self.rows)
+
+    def test_no_compression_when_not_accepted(self):
+        response = self.post()
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+
+class TracksNDJSONTests(AuthenticatedAPITestCase):
+
+    times_jd = 2461011.25 + np.arange(6) / 144.0
+    tracks = [
+        {"name": "1 Stub", "index": np.array([0, 2, 5]), "ra": np.array([359.9, 0.05, 0.2]),
+         "dec": np.array([10.0, 10.1, 10.2]), "alt": np.array([20.0, 21.0, 22.123456789])},
+        {"name": "2 Stub", "index": np.array([1, 4]), "ra": np.array([12.5, 12.6]),
+         "dec": np.array([-5.0, -5.1]), "alt": np.array([11.0, 12.0])},
+    ]
+
+    def test_framing(self):
+        chunks = list(stream_tracks_ndjson(self.times_jd, iter(self.tracks)))
+        # one chunk per line: the grid, then one line per object
+        self.assertEqual(len(chunks), 1 + len(self.tracks))
+        for chunk in chunks:
+            self.assertTrue(chunk.endswith("\n"))
+            self.assertNotIn("\n", chunk[:-1])
+
+        lines = [json.loads(chunk) for chunk in chunks]
+        self.assertEqual(lines[0], {"jd": self.times_jd.tolist()})
+        self.assertEqual([line["name"] for line in lines[1:]], ["1 Stub", "2 Stub"])
+        self.assertEqual(lines[1]["index"], [0, 2, 5])
+        self.assertEqual(lines[1]["alt"][-1], round(22.123456789, TRACK_DECIMALS))
+        for line in lines[1:]:
+            self.assertEqual(set(line), {"name", "index", "ra", "dec", "alt"})
+            self.assertEqual(len({len(line[key]) for key in ("index", "ra", "dec", "alt")}), 1)
+
+    def test_empty_tracks_still_send_the_grid(self):
+        chunks = list(stream_tracks_ndjson(self.times_jd, iter([])))
+        self.assertEqual([json.loads(chunk) for chunk in chunks], [{"jd": self.times_jd.tolist()}])
+
+    def test_view_streams_ndjson(self):
+        with mock.patch("events.views.get_query_tracks",
+                        return_value=(self.times_jd, iter(self.tracks))) as query:
+            response = self.client.post("/events/tracks/", dict(QUERY, names="1 Stub, 2 Stub"),
+                                        format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(query.call_args.kwargs["names"], ["1 Stub", "2 Stub"])
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[2])["name"], "2 Stub")
+
+    def test_non_finite_tracks_are_dropped(self):
+        # e >= 1 (SBDB zwraca też takie) daje NaN w propagacji
+        good = synthetic_catalog(1)[0]
+        hyperbolic = dict(good, name="Hyperbolic", a="1.5", e="1.2")
+        with mock.patch("integrations.views.query_objects", return_value=[hyperbolic, good]):
+            response = self.client.post("/events/tracks/", dict(QUERY, visible_only="false"),
+                                        format="json")
+        self.assertEqual(response.status_code, 200)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        def reject(constant):
+            raise ValueError(constant)
+        lines = [json.loads(line, parse_constant=reject) for line in lines]
+        self.assertEqual([line["name"] for line in lines[1:]], [good["name"]])
+
+
+@override_settings(INTEGRATIONS_MEMORY_BUDGET_MB=1)
+class QuerySizeTests(AuthenticatedAPITestCase):
+
+    long_query = dict(QUERY, begin_time="2000-01-01T00:00:00+00:00",
+                      end_time="2030-01-01T00:00:00+00:00")
+
+    def test_too_long_range_is_400_before_the_catalog_is_fetched(self):
+        for url in ("/events/", "/events/tracks/"):
+            with mock.patch("integrations.views.query_objects") as query:
+                response = self.client.post(url, self.long_query, format="json")
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json(), {"detail": TOO_LONG_RANGE})
+            query.assert_not_called()
+
+
+class TileGridTests(SimpleTestCase):
+
+    def test_grid_and_bounds(self):
+        self.assertEqual(tile_grid(0), (2, 1))
+        self.assertEqual(tile_grid(3), (16, 8))
+        self.assertEqual(tile_bounds(0, 1, 0), (180.0, 360.0, 0.0, 180.0))
+        self.assertEqual(tile_bounds(2, 7, 3), (315.0, 360.0, 135.0, 180.0))
+
+    def test_u_wraps_at_360(self):
+        x, _ = tile_index(np.array([0.0, 359.999, 360.0, 361.0, -1.0]), np.full(5, 10.0), 2)
+        self.assertEqual(x.tolist(), [0, 7, 0, 0, 7])
+
+    def test_pole_rows(self):
+        # v = 90 - Dec: Dec +90 on the first row, Dec -90 on the last one
+        _, y = tile_index(np.zeros(3), 90.0 - np.array([90.0, 0.0, -90.0]), 2)
+        self.assertEqual(y.tolist(), [0, 2, 3])
+
+    def test_cut_tile_edges(self):
+        positions = {"jd": 2461011.25, "name": ["north", "wrap", "south"],
+                     "ra": np.array([10.0, 360.0, 200.0]), "dec": np.array([90.0, 0.0, -90.0]),
+                     "alt": np.array([20.0, 30.0, 40.0]), "az": np.array([0.0, 90.0, 180.0])}
+        self.assertEqual(cut_tile(positions, "radec", 1, 0, 0)["name"], ["north"])
+        self.assertEqual(cut_tile(positions, "radec", 1, 0, 1)["name"], ["wrap"])
+        south = cut_tile(positions, "radec", 1, 2, 1)
+        self.assertEqual(south["name"], ["south"])
+        self.assertEqual(south["py"], [TILE_SIZE])
+        self.assertEqual(cut_tile(positions, "radec", 1, 3, 1)["name"], [])
+
+    def test_validate_tile(self):
+        validate_tile("radec", 0, 1, 0)
+        validate_tile("altaz", 8, 511, 255)
+        for args in (("mercator", 0, 0, 0), ("radec", 0, 2, 0), ("radec", 0, 0, 1),
+                     ("radec", 9, 0, 0), ("radec", 1, -1, 0)):
+            with self.assertRaises(TileNotFound):
+                validate_tile(*args)
+
+
+class TileViewTests(AuthenticatedAPITestCase):
+
+    params = {"latitude": LATITUDE, "longitude": LONGITUDE, "time": "2025-12-01T20:00:00+00:00"}
+
+    def setUp(self):
+        super().setUp()
+        caches[CACHE_ALIAS].clear()
+        self.addCleanup(caches[CACHE_ALIAS].clear)
+        columns = {"name": ["1 Stub", "2 Stub", "3 Stub"],
+                   "ra": np.array([10.0, 100.0, 200.0]), "dec": np.array([20.0, -10.0, 5.0]),
+                   "alt": np.array([30.0, 5.0, 45.0]), "az": np.array([120.0, 200.0, 300.0]),
+                   "elong": np.array([120.0, 90.0, 60.0])}
+        for target, kwargs in (("events.tiles.positions_at", {"return_value": (columns, 2461011.3)}),
+                               ("events.tiles.query_objects", {"return_value": []})):
+            patcher = mock.patch(target, **kwargs)
+            setattr(self, target.rsplit(".", 1)[1], patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def get(self, projection="radec", z=0, x=0, y=0, **params):
+        return self.client.get(f"/events/tiles/{projection}/{z}/{x}/{y}/", dict(self.params, **params))
+
+    def test_tile(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        # 2 Stub is below QUERY_MIN_ALT_DEG, 3 Stub is in the other tile
+        self.assertEqual(response.json()["name"], ["1 Stub"])
+        self.assertIn("max-age", response["Cache-Control"])
+
+    def test_second_request_is_served_from_the_cache(self):
+        first = self.get().json()
+        self.assertEqual(self.get().json(), first)
+        # another tile of the same site and time bucket reuses the positions
+        self.assertEqual(self.get(x=1).json()["name"], ["3 Stub"])
+        self.assertEqual(self.positions_at.call_count, 1)
+        self.assertEqual(self.query_objects.call_count, 1)
+
+    def test_tile_outside_the_grid_is_404(self):
+        for url in ({"x": 2}, {"y": 1}, {"z": 9}, {"projection": "mercator"}):
+            response = self.get(**url)
+            self.assertEqual(response.status_code, 404)
+        self.positions_at.assert_not_called()
+
+    def test_engine_errors_are_502_not_404(self):
+        self.positions_at.side_effect = ValueError("precision must be one of ...")
+        self.assertEqual(self.get().status_code, 502)
+
+    def test_get_tile_validates_first(self):
+        with self.assertRaises(TileNotFound):
+            get_tile("radec", 0, 5, 0, LATITUDE, LONGITUDE, 2461011.3)
+        self.positions_at.assert_not_called()
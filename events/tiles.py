@@ -0,0 +1,137 @@
+"""
+Server-side sky-map tiles of the visible objects.
+
+The sky is an equirectangular grid: u = RA (or azimuth) 0..360 deg along x,
+v = 90 - Dec (or 90 - alt) 0..180 deg along y, i.e. row 0 starts at the
+celestial pole (zenith). Zoom z has 2**(z+1) x 2**z square tiles of
+180 / 2**z deg. Tiles are vector tiles: columns of the objects falling in the
+tile plus their pixel position inside it (TILE_SIZE x TILE_SIZE).
+
+Positions come from one vectorized integrations.views.positions_at() call per
+(site, time bucket) - the sky positions - and each tile is cut from them only
+when requested, so only tiles in a client's viewport are ever built. Both
+are kept in the "skymap" cache (LRU with eviction, see settings.CACHES).
+"""
+import math
+
+import numpy as np
+from django.core.cache import caches
+
+from integrations.views import (QUERY_CADENCE_MIN, QUERY_MIN_ALT_DEG, QUERY_MIN_ELONG_DEG,
+                                query_engine_options, query_objects, positions_at)
+
+CACHE_ALIAS = "skymap"
+
+# projection -> (column along x, column along y)
+PROJECTIONS = {
+    "radec": ("ra", "dec"),
+    "altaz": ("az", "alt"),
+}
+MAX_ZOOM = 8
+TILE_SIZE = 256
+# site coordinates are rounded for the cache key (0.01 deg ~ 1 km)
+SITE_DECIMALS = 2
+# tiles of one time bucket share the positions computed at its start
+BUCKET_MIN = QUERY_CADENCE_MIN
+POSITION_COLUMNS = ("name", "ra", "dec", "alt", "az")
+
+
+class TileNotFound(Exception):
+    """Unknown projection or a tile outside the grid."""
+
+
+def tile_grid(z):
+    """(columns, rows) of tiles at zoom z."""
+    return 2 ** (z + 1), 2 ** z
+
+
+def tile_bounds(z, x, y):
+    """(u0, u1, v0, v1) in degrees covered by tile (z, x, y)."""
+    span = 180.0 / 2 ** z
+    return x * span, (x + 1) * span, y * span, (y + 1) * span
+
+
+def tile_index(u, v, z):
+    """
+    (x, y) arrays of the tiles at zoom z holding the points (u, v) in degrees.
+    u wraps at 360; v = 180 (Dec or alt -90) belongs to the last row.
+    """
+    columns, rows = tile_grid(z)
+    span = 180.0 / 2 ** z
+    x = np.floor(np.mod(u, 360.0) / span).astype(np.int64) % columns
+    y = np.clip(np.floor(np.asarray(v) / span).astype(np.int64), 0, rows - 1)
+    return x, y
+
+
+def validate_tile(projection, z, x, y):
+    """Raise TileNotFound for an unknown projection or a tile outside the grid."""
+    if projection not in PROJECTIONS:
+        raise TileNotFound(f"projection must be one of {sorted(PROJECTIONS)}")
+    columns, rows = tile_grid(z) if 0 <= z <= MAX_ZOOM else (0, 0)
+    if not (0 <= x < columns and 0 <= y < rows):
+        raise TileNotFound("tile outside the grid")
+
+
+def time_bucket(jd):
+    return math.floor(jd * 24 * 60 / BUCKET_MIN)
+
+
+def _site(latitude, longitude):
+    return round(latitude, SITE_DECIMALS), round(longitude, SITE_DECIMALS)
+
+
+def get_sky_positions(latitude, longitude, bucket, limit=100):
+    """Visible objects of the site at the start of the time bucket (cached)."""
+    cache = caches[CACHE_ALIAS]
+    key = f"positions:{latitude}:{longitude}:{bucket}"
+    positions = cache.get(key)
+    if positions is None:
+        from astropy.time import Time
+        instant = Time(bucket * BUCKET_MIN / (24 * 60), format='jd')
+        columns, jd = positions_at(query_objects(limit), instant,
+                                   observer_lat=latitude, observer_lon=longitude,
+                                   observer_elev_m=100,
+                                   precision=query_engine_options()["precision"])
+        visible = (columns["alt"] >= QUERY_MIN_ALT_DEG) & (columns["elong"] >= QUERY_MIN_ELONG_DEG)
+        positions = {"jd": jd, "name": [n for n, v in zip(columns["name"], visible) if v]}
+        for column in POSITION_COLUMNS[1:]:
+            positions[column] = np.asarray(columns[column][visible], dtype=np.float64)
+        cache.set(key, positions)
+    return positions
+
+
+def cut_tile(positions, projection, z, x, y):
+    """Vector tile (z, x, y) of the sky positions as a JSON-ready dict of columns."""
+    u_column, v_column = PROJECTIONS[projection]
+    u0, u1, v0, v1 = tile_bounds(z, x, y)
+    u = np.mod(positions[u_column], 360.0)
+    v = 90.0 - positions[v_column]
+    tile_x, tile_y = tile_index(u, v, z)
+    inside = (tile_x == x) & (tile_y == y)
+    scale = TILE_SIZE / (u1 - u0)
+
+    tile = {"projection": projection, "z": z, "x": x, "y": y, "jd": positions["jd"],
+            "name": [n for n, keep in zip(positions["name"], inside) if keep]}
+    for column in POSITION_COLUMNS[1:]:
+        tile[column] = positions[column][inside].tolist()
+    tile["px"] = np.round((u[inside] - u0) * scale, 2).tolist()
+    tile["py"] = np.round((v[inside] - v0) * scale, 2).tolist()
+    return tile
+
+
+def get_tile(projection, z, x, y, latitude, longitude, jd):
+    """
+    Tile for the site and instant, built (and cached) on first use.
+    Raises TileNotFound (see validate_tile) before any computation.
+    """
+    validate_tile(projection, z, x, y)
+
+    latitude, longitude = _site(latitude, longitude)
+    bucket = time_bucket(jd)
+    cache = caches[CACHE_ALIAS]
+    key = f"tile:{projection}:{latitude}:{longitude}:{bucket}:{z}:{x}:{y}"
+    tile = cache.get(key)
+    if tile is None:
+        tile = cut_tile(get_sky_positions(latitude, longitude, bucket), projection, z, x, y)
+        cache.set(key, tile)
+    return tile
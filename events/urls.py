@@ -1,6 +1,8 @@
 from django.urls import path
-from .views import events_view
+from .views import events_view, tile_view, tracks_view
 
 urlpatterns = [
     path('events/', events_view, name='events'),
+    path('events/tracks/', tracks_view, name='tracks'),
+    path('events/tiles/<str:projection>/<int:z>/<int:x>/<int:y>/', tile_view, name='tiles'),
 ]
\ No newline at end of file
@@ -1,19 +1,41 @@
-from datetime import datetime
+from datetime import datetime, timezone
 
-from rest_framework.decorators import api_view, permission_classes
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
-from integrations.views import get_query_sbo # moduł integracji z NASA
+from integrations.planner import MemoryBudgetExceeded
+from integrations.views import get_query_sbo_columns, get_query_tracks # moduł integracji z NASA
+from .compression import compress_page
+from .renderers import VISIBILITY_RENDERERS, is_columns, stream_tracks_ndjson
+from .tiles import BUCKET_MIN, TileNotFound, get_tile, validate_tile
 
+TOO_LONG_RANGE = "Zbyt długi przedział 'begin_time' - 'end_time' dla jednego zapytania."
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])  
-def events_view(request):
+
+def _request_data(request):
+    # ?format=... wybiera tylko format odpowiedzi, nie jest parametrem zapytania
+    if set(request.query_params) - {'format'}:
+        return request.query_params
+    return request.data
+
+
+def parse_iso(dt_str: str):
     
-    data = request.query_params or request.data
+    try:
+        return datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
+    except ValueError:
+        return None
 
+
+def _parse_query(data):
+    """
+    Wspólna walidacja parametrów latitude/longitude/begin_time/end_time.
+    Zwraca ((lat, lon, start_dt, end_dt), None) albo (None, Response z błędem 400).
+    """
     latitude = data.get('latitude')
     longitude = data.get('longitude')
     begin_time = data.get('begin_time')
@@ -31,7 +53,7 @@ def events_view(request):
         missing.append('end_time')
 
     if missing:
-        return Response(
+        return None, Response(
             {"detail": f"Brak wymaganych parametrów: {', '.join(missing)}"},
             status=status.HTTP_400_BAD_REQUEST,
         )
@@ -41,51 +63,171 @@ def events_view(request):
         lat = float(latitude)
         lon = float(longitude)
     except ValueError:
-        return Response(
+        return None, Response(
             {"detail": "Parametry 'latitude' i 'longitude' muszą być liczbami (float)."},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    
-    def parse_iso(dt_str: str):
-        
-        try:
-            return datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
-        except ValueError:
-            return None
-
     start_dt = parse_iso(begin_time)
     end_dt = parse_iso(end_time)
 
     if start_dt is None or end_dt is None:
-        return Response(
+        return None, Response(
             {"detail": "Parametry 'begin_time' i 'end_time' muszą być w formacie ISO 8601."},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
     if start_dt >= end_dt:
-        return Response(
+        return None, Response(
             {"detail": "'begin_time' musi być wcześniejszy niż 'end_time'."},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
+    return (lat, lon, start_dt, end_dt), None
+
+
+@compress_page
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])  
+@renderer_classes(VISIBILITY_RENDERERS)
+def events_view(request):
+    
+    query, error = _parse_query(_request_data(request))
+    if error is not None:
+        return error
+    lat, lon, start_dt, end_dt = query
+
     try:
-        events = get_query_sbo(
+        events = get_query_sbo_columns(
             latitude=lat,
             longitude=lon,
             begin_time=start_dt,
             end_time=end_dt,
         )
+    except MemoryBudgetExceeded:
+        return Response(
+            {"detail": TOO_LONG_RANGE},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
     except Exception as e:
         return Response(
             {"detail": "Błąd podczas pobierania danych z modułu NASA."},
             status=status.HTTP_502_BAD_GATEWAY,
         )
 
-    if not isinstance(events, list):
+    if not is_columns(events):
         return Response(
             {"detail": "Nieprawidłowy format danych zwróconych przez moduł NASA."},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
     return Response(events, status=status.HTTP_200_OK)
+
+
+@compress_page
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def tracks_view(request):
+    """
+    Próbkowane trajektorie (RA/Dec/alt) obiektów w zadanym przedziale czasu,
+    strumieniowane jako NDJSON (patrz events.renderers.stream_tracks_ndjson):
+    jedna linia na obiekt, z całym przedziałem czasu.
+
+    Dodatkowe parametry:
+      names         - lista nazw obiektów (lub napis rozdzielony przecinkami); domyślnie wszystkie
+      visible_only  - tylko obiekty widoczne choć raz w przedziale (domyślnie true)
+      tolerance     - tolerancja Douglasa-Peuckera w stopniach, na niebie i w wysokości
+                      (domyślnie 0 = wszystkie próbki)
+    """
+    data = _request_data(request)
+    query, error = _parse_query(data)
+    if error is not None:
+        return error
+    lat, lon, start_dt, end_dt = query
+
+    names = data.get('names')
+    if isinstance(names, str):
+        names = [name.strip() for name in names.split(',') if name.strip()]
+
+    visible_only = str(data.get('visible_only', 'true')).lower() not in ('0', 'false', 'no')
+
+    try:
+        tolerance = float(data.get('tolerance', 0.0))
+    except (TypeError, ValueError):
+        return Response(
+            {"detail": "Parametr 'tolerance' musi być liczbą (float)."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        times_jd, tracks = get_query_tracks(
+            latitude=lat,
+            longitude=lon,
+            begin_time=start_dt,
+            end_time=end_dt,
+            names=names,
+            visible_only=visible_only,
+            tolerance_deg=tolerance,
+        )
+    except MemoryBudgetExceeded:
+        return Response(
+            {"detail": TOO_LONG_RANGE},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    except Exception as e:
+        return Response(
+            {"detail": "Błąd podczas pobierania danych z modułu NASA."},
+            status=status.HTTP_502_BAD_GATEWAY,
+        )
+
+    return StreamingHttpResponse(
+        stream_tracks_ndjson(times_jd, tracks),
+        content_type="application/x-ndjson",
+        status=status.HTTP_200_OK,
+    )
+
+
+@compress_page
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def tile_view(request, projection, z, x, y):
+    """
+    Kafelek mapy nieba (events.tiles) z obiektami widocznymi z miejsca
+    latitude/longitude w chwili time (ISO 8601, domyślnie teraz).
+    """
+    data = request.query_params
+
+    try:
+        validate_tile(projection, z, x, y)
+    except TileNotFound as e:
+        return Response({"detail": str(e)}, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        lat = float(data['latitude'])
+        lon = float(data['longitude'])
+    except (KeyError, ValueError):
+        return Response(
+            {"detail": "Parametry 'latitude' i 'longitude' muszą być liczbami (float)."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    when = parse_iso(data['time']) if 'time' in data else datetime.now(timezone.utc)
+    if when is None:
+        return Response(
+            {"detail": "Parametr 'time' musi być w formacie ISO 8601."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    from astropy.time import Time
+
+    try:
+        tile = get_tile(projection, z, x, y, lat, lon, Time(when).jd)
+    except Exception as e:
+        return Response(
+            {"detail": "Błąd podczas pobierania danych z modułu NASA."},
+            status=status.HTTP_502_BAD_GATEWAY,
+        )
+
+    response = Response(tile, status=status.HTTP_200_OK)
+    patch_cache_control(response, private=True, max_age=BUCKET_MIN * 60)
+    return response
@@ -0,0 +1,95 @@
+# Migawka katalogu elementów orbitalnych przeliczona na wspólną, niedawną
+# epokę odniesienia (manage.py reepoch_elements, uruchamiane okresowo z crona).
+# Poza elementami zawiera niezmienniki z element_invariants(), dzięki czemu
+# propagacja w zapytaniu to tylko rozwiązanie równania Keplera i jedno
+# mnożenie macierzy (orbit_xyz_from_invariants), przy małym t - epoka.
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+from integrations.views import ORBIT_KEYS, element_invariants
+
+# elementy (po przeliczeniu: ma w deg i epoch = epoka odniesienia) + niezmienniki
+SNAPSHOT_ARRAYS = ORBIT_KEYS + ("ma_ref", "n", "nu_factor", "rotation")
+
+_cache_lock = threading.Lock()
+_cache = {"key": None, "rows": None}
+
+
+def recent_epoch_jd(now=None):
+    """JD of the most recent 0h UTC - the default reference epoch."""
+    jd = (time.time() if now is None else now) / 86400.0 + 2440587.5
+    return math.floor(jd - 0.5) + 0.5
+
+
+def build_snapshot(objects, ref_epoch_jd):
+    """
+    Re-epoch SBDB rows (dicts with name,a,e,i,om,w,ma,epoch) to ref_epoch_jd.
+    Rows with missing/non-numeric or non-elliptic elements are dropped.
+    Returns dict of arrays (SNAPSHOT_ARRAYS + "name"), plus "ref_epoch".
+    """
+    names, elements = [], []
+    for orb in objects:
+        try:
+            row = [float(orb[key]) for key in ORBIT_KEYS]
+        except (KeyError, TypeError, ValueError):
+            continue
+        a, e = row[0], row[1]
+        if not (a > 0 and 0 <= e < 1):
+            continue
+        names.append(orb.get("name", orb.get("designation", "unnamed")))
+        elements.append(row)
+    elements = np.array(elements, dtype=np.float64).reshape(-1, len(ORBIT_KEYS))
+    a, e, inc, raan, argp, ma, epoch = elements.T
+
+    invariants = element_invariants(a, e, inc, raan, argp, ma, epoch, ref_epoch_jd)
+    snapshot = {"name": np.array(names, dtype=str), "a": a, "e": e, "i": inc, "om": raan,
+                "w": argp, "ma": np.rad2deg(invariants["ma_ref"]),
+                "epoch": np.full(a.shape, ref_epoch_jd), "ref_epoch": np.float64(ref_epoch_jd)}
+    snapshot.update(invariants)
+    return snapshot
+
+
+def save_snapshot(snapshot, path):
+    """Write atomically, so running workers never load a partial file."""
+    tmp = f"{path}.tmp.npz"
+    np.savez(tmp, **snapshot)
+    os.replace(tmp, path)
+
+
+def snapshot_rows(snapshot):
+    """Snapshot arrays -> list of object dicts accepted by the engine."""
+    rows = []
+    for k, name in enumerate(snapshot["name"].tolist()):
+        row = {key: snapshot[key][k] for key in SNAPSHOT_ARRAYS}
+        row["name"] = name
+        rows.append(row)
+    return rows
+
+
+def snapshot_objects(path=None):
+    """
+    Rows of the snapshot at settings.INTEGRATIONS_ELEMENT_SNAPSHOT, or None
+    when it is not configured / not built yet. Loaded once per process and
+    reloaded when the file changes.
+    """
+    if path is None:
+        from django.conf import settings
+        path = getattr(settings, "INTEGRATIONS_ELEMENT_SNAPSHOT", None)
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        if _cache["key"] != key:
+            with np.load(path) as data:
+                _cache["rows"] = snapshot_rows({name: data[name] for name in data.files})
+            _cache["key"] = key
+        return _cache["rows"]
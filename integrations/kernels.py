@@ -0,0 +1,219 @@
+# Szybka ścieżka transformacji heliocentryczne XYZ -> RA/Dec/alt/elongacja.
+#
+# compute_radec_alt_for_vector() w views.py jest implementacją referencyjną;
+# tutaj te same wzory liczone są bez tymczasowych tablic: niezmienniki zapytania
+# (LST, sin/cos szerokości, |Ziemia|) liczone są raz w TopocentricFrame, a
+# wyniki trafiają do buforów `out=` używanych ponownie przez każdy wątek.
+# Jeśli zainstalowana jest numba, całość liczy jedna skompilowana pętla.
+#
+# Precyzja (dtype ramki): float64 albo float32. Różnica obiekt - Ziemia jest
+# zawsze liczona w float64 (wektory Ziemi zostają float64), dopiero wynik
+# trafia do buforów w dtype ramki - to ogranicza błąd float32 do ~1e-5 deg.
+import math
+import threading
+
+import numpy as np
+
+# Wyłącza pętlę JIT nawet gdy numba jest dostępna (np. do porównań).
+USE_JIT = True
+
+# Dopuszczalna różnica (deg) szybkiej ścieżki float64 względem referencyjnej.
+TOLERANCE_DEG = 1e-9
+
+_jit_kernel = None
+_jit_checked = False
+
+
+class TopocentricFrame:
+    """
+    Per-request invariants of the topocentric transform for one time grid
+    and observer: Earth vectors as contiguous rows, |Earth|, local sidereal
+    time and sin/cos of latitude. Also hands out per-thread work buffers.
+    dtype: precision of everything after the object - Earth difference.
+    """
+
+    def __init__(self, earth_xyz, times_jd, lat_deg, lon_deg, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        self.ex = np.ascontiguousarray(earth_xyz[0], dtype=np.float64)
+        self.ey = np.ascontiguousarray(earth_xyz[1], dtype=np.float64)
+        self.ez = np.ascontiguousarray(earth_xyz[2], dtype=np.float64)
+        self.size = self.ex.size
+        self.earth_norm = np.sqrt(self.ex*self.ex + self.ey*self.ey + self.ez*self.ez).astype(self.dtype)
+
+        # fast GMST approx in hours -> rad, as in compute_radec_alt_for_vector
+        gmst_hours = (18.697374558 + 24.06570982441908 * (np.asarray(times_jd) - 2451545.0)) % 24.0
+        gmst_rad = gmst_hours * (2*np.pi/24.0)
+        self.lst = (gmst_rad + np.deg2rad(lon_deg)).astype(self.dtype)
+
+        lat_rad = np.deg2rad(lat_deg)
+        self.sin_lat = float(np.sin(lat_rad))
+        self.cos_lat = float(np.cos(lat_rad))
+
+        self._local = threading.local()
+
+    @classmethod
+    def from_location(cls, earth_xyz, times_jd, location, dtype=np.float64):
+        return cls(earth_xyz, times_jd, location.lat.value, location.lon.value, dtype)
+
+    def _derived(self, take):
+        frame = object.__new__(type(self))
+        frame.dtype = self.dtype
+        frame.ex = take(self.ex)
+        frame.ey = take(self.ey)
+        frame.ez = take(self.ez)
+        frame.size = frame.ex.size
+        frame.earth_norm = take(self.earth_norm)
+        frame.lst = take(self.lst)
+        frame.sin_lat = self.sin_lat
+        frame.cos_lat = self.cos_lat
+        frame._local = threading.local()
+        return frame
+
+    def repeat(self, count):
+        """Frame with every sample repeated count times (many objects, one instant)."""
+        return self._derived(lambda a: np.repeat(a, count))
+
+    def buffers(self):
+        """
+        (out, work) arrays of shape (4, N) and (5, N) owned by the calling
+        thread; reused on every call, so results must be consumed (or
+        copied) before the same thread transforms the next object.
+        """
+        local = self._local
+        if getattr(local, "out", None) is None:
+            local.out = np.empty((4, self.size), dtype=self.dtype)
+            local.work = np.empty((5, self.size), dtype=self.dtype)
+        return local.out, local.work
+
+
+def _numpy_kernel(X, Y, Z, frame, out, work):
+    ra, dec, alt, elong = out
+    gx, gy, gz, t1, t2 = work
+
+    # geocentric vector (object from earth)
+    np.subtract(X, frame.ex, out=gx)
+    np.subtract(Y, frame.ey, out=gy)
+    np.subtract(Z, frame.ez, out=gz)
+
+    # elongation: dot((-earth), g) / (|earth| |g|)
+    np.multiply(frame.ex, gx, out=t1)
+    np.multiply(frame.ey, gy, out=t2)
+    np.add(t1, t2, out=t1)
+    np.multiply(frame.ez, gz, out=t2)
+    np.add(t1, t2, out=t1)
+    np.negative(t1, out=t1)
+    # |g|^2, keeping gx^2 + gy^2 in alt for dec below
+    np.multiply(gx, gx, out=alt)
+    np.multiply(gy, gy, out=t2)
+    np.add(alt, t2, out=alt)
+    np.multiply(gz, gz, out=t2)
+    np.add(alt, t2, out=t2)
+    np.sqrt(t2, out=t2)
+    np.multiply(frame.earth_norm, t2, out=t2)
+    np.divide(t1, t2, out=t1)
+    np.clip(t1, -1.0, 1.0, out=t1)
+    np.arccos(t1, out=elong)
+
+    # RA/DEC
+    np.arctan2(gy, gx, out=ra)
+    np.mod(ra, 2*np.pi, out=ra)
+    np.sqrt(alt, out=alt)
+    np.arctan2(gz, alt, out=dec)
+
+    # hour angle normalized to [-pi, pi]
+    np.subtract(frame.lst, ra, out=t1)
+    np.add(t1, np.pi, out=t1)
+    np.mod(t1, 2*np.pi, out=t1)
+    np.subtract(t1, np.pi, out=t1)
+
+    # altitude
+    np.cos(t1, out=t1)
+    np.cos(dec, out=t2)
+    np.multiply(t2, frame.cos_lat, out=t2)
+    np.multiply(t1, t2, out=t1)
+    np.sin(dec, out=t2)
+    np.multiply(t2, frame.sin_lat, out=t2)
+    np.add(t2, t1, out=t1)
+    np.arcsin(t1, out=alt)
+
+    np.rad2deg(out, out=out)
+
+
+def _fused_loop(X, Y, Z, ex, ey, ez, earth_norm, lst, sin_lat, cos_lat, out):
+    two_pi = 2.0 * math.pi
+    for k in range(X.shape[0]):
+        gx = X[k] - ex[k]
+        gy = Y[k] - ey[k]
+        gz = Z[k] - ez[k]
+
+        rho2 = gx*gx + gy*gy
+        norm2 = math.sqrt(rho2 + gz*gz)
+        dot = -(ex[k]*gx + ey[k]*gy + ez[k]*gz)
+        c = dot / (earth_norm[k] * norm2)
+        c = min(max(c, -1.0), 1.0)
+
+        ra = math.atan2(gy, gx) % two_pi
+        dec = math.atan2(gz, math.sqrt(rho2))
+        ha = (lst[k] - ra + math.pi) % two_pi - math.pi
+        alt = math.asin(sin_lat*math.sin(dec) + cos_lat*math.cos(dec)*math.cos(ha))
+
+        out[0, k] = math.degrees(ra)
+        out[1, k] = math.degrees(dec)
+        out[2, k] = math.degrees(alt)
+        out[3, k] = math.degrees(math.acos(c))
+
+
+def jit_kernel():
+    """The numba-compiled _fused_loop, or None if numba is not installed."""
+    global _jit_kernel, _jit_checked
+    if not _jit_checked:
+        try:
+            import numba
+        except ImportError:
+            _jit_kernel = None
+        else:
+            _jit_kernel = numba.njit(cache=True, nogil=True)(_fused_loop)
+        _jit_checked = True
+    return _jit_kernel
+
+
+def compute_radec_alt_fast(X, Y, Z, frame, out=None, use_jit=None):
+    """
+    Same result as compute_radec_alt_for_vector (to ~1e-12 deg), without
+    temporaries. X,Y,Z: arrays [N] (AU); frame: TopocentricFrame.
+    out: optional (4, N) array of frame.dtype; defaults to the calling thread's
+    reusable buffer (see TopocentricFrame.buffers).
+    use_jit: None = use numba when available, False = numpy kernel.
+    Returns ra_deg, dec_deg, alt_deg, elong_deg as rows (views) of out.
+    """
+    thread_out, work = frame.buffers()
+    if out is None:
+        out = thread_out
+
+    kernel = jit_kernel() if (use_jit is None and USE_JIT) or use_jit else None
+    if kernel is not None:
+        kernel(np.asarray(X, dtype=np.float64), np.asarray(Y, dtype=np.float64),
+               np.asarray(Z, dtype=np.float64), frame.ex, frame.ey, frame.ez,
+               frame.earth_norm, frame.lst, frame.sin_lat, frame.cos_lat, out)
+    else:
+        _numpy_kernel(X, Y, Z, frame, out, work)
+    return out[0], out[1], out[2], out[3]
+
+
+def azimuth_deg(ra_deg, dec_deg, frame):
+    """
+    Azimuth (deg, from north through east, 0..360) for RA/Dec arrays on the
+    frame's samples; complements compute_radec_alt_fast, which returns alt.
+    """
+    ha = frame.lst - np.deg2rad(ra_deg)
+    dec = np.deg2rad(dec_deg)
+    az = np.arctan2(-np.cos(dec) * np.sin(ha),
+                    np.sin(dec) * frame.cos_lat - np.cos(dec) * frame.sin_lat * np.cos(ha))
+    return np.mod(np.rad2deg(az), 360.0)
+
+
+def angle_diff(got, expected):
+    """|got - expected| per row, RA (row 0) compared modulo 360."""
+    diff = np.abs(got - expected)
+    diff[0] = np.minimum(diff[0], 360.0 - diff[0])
+    return diff
@@ -0,0 +1,74 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from integrations.kernels import (TOLERANCE_DEG, TopocentricFrame, angle_diff,
+                                  compute_radec_alt_fast, jit_kernel)
+from integrations.sbdb_stub import synthetic_catalog
+from integrations.views import (ORBIT_KEYS, compute_radec_alt_for_vector,
+                                earth_heliocentric_positions, make_time_grid,
+                                orbit_xyz_vectorized)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare compute_radec_alt_for_vector with the fused kernels in "
+        "integrations.kernels: max difference (must be <= 1e-9 deg) and speedup."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--objects", type=int, default=500)
+        parser.add_argument("--days", type=float, default=7.0)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        from astropy.coordinates import EarthLocation
+        from astropy.time import Time
+        import astropy.units as u
+
+        start = Time("2025-12-01 00:00:00")
+        times = make_time_grid(start, start + options["days"] * u.day, 10)
+        times_jd = times.jd
+        earth_xyz = earth_heliocentric_positions(times_jd)
+        location = EarthLocation(lat=52.23*u.deg, lon=21.01*u.deg, height=100*u.m)
+        frame = TopocentricFrame.from_location(earth_xyz, times_jd, location)
+
+        orbits = []
+        for orb in synthetic_catalog(options["objects"]):
+            elements = [float(orb[key]) for key in ORBIT_KEYS]
+            orbits.append(orbit_xyz_vectorized(*elements, times_jd)[:3])
+
+        def reference():
+            return [np.array(compute_radec_alt_for_vector(X, Y, Z, earth_xyz, times, location))
+                    for X, Y, Z in orbits]
+
+        def fast(use_jit):
+            def run():
+                return [np.array(compute_radec_alt_fast(X, Y, Z, frame, use_jit=use_jit))
+                        for X, Y, Z in orbits]
+            return run
+
+        variants = [("reference", reference), ("numpy out=", fast(False))]
+        if jit_kernel() is not None:
+            fast(True)()  # compile outside the timing
+            variants.append(("numba fused", fast(True)))
+        else:
+            self.stdout.write("numba not installed: skipping the JIT kernel")
+
+        expected = reference()
+        self.stdout.write(f"{options['objects']} objects x {times_jd.size} samples, "
+                          f"best of {options['repeat']}")
+        base = None
+        for label, run in variants:
+            best = float("inf")
+            for _ in range(options["repeat"]):
+                t0 = time.perf_counter()
+                got = run()
+                best = min(best, time.perf_counter() - t0)
+            diff = max(float(np.max(angle_diff(g, e))) for g, e in zip(got, expected))
+            base = base or best
+            self.stdout.write(f"  {label:<12} {best * 1000:9.1f} ms  x{base / best:5.2f}  "
+                              f"max diff {diff:.2e} deg")
+            if diff > TOLERANCE_DEG:
+                raise CommandError(f"{label} differs from the reference by {diff:.2e} deg")
@@ -0,0 +1,80 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+# Imports that integrations.views used to do at module load; "eager" runs
+# preload them to reproduce the old startup cost for comparison.
+EAGER_IMPORTS = (
+    "import pandas, astropy.units, astropy.time, astropy.coordinates, astropy.constants"
+)
+
+CHECK_SNIPPET = """
+{preload}
+from django.core.management import execute_from_command_line
+execute_from_command_line(['manage.py', 'check'])
+"""
+
+FIRST_REQUEST_SNIPPET = """
+import time
+t_start = time.perf_counter()
+{preload}
+import django
+django.setup()
+from integrations import views
+t_ready = time.perf_counter()
+if {warm}:
+    views.warm_up()
+t_warm = time.perf_counter()
+from integrations.sbdb_stub import synthetic_catalog
+objects = synthetic_catalog(50)
+views.visibility_for_many(objects, "2025-12-09 18:00:00", "2025-12-10 06:00:00",
+                          observer_lat=52.23, observer_lon=21.01,
+                          min_alt_deg=10.0, min_elong_deg=22.0)
+t_first = time.perf_counter()
+print(t_ready - t_start, t_warm - t_ready, t_first - t_warm)
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure process startup cost: `manage.py check` wall time and "
+        "time-to-first visibility computation, with lazy vs eager heavy imports "
+        "and with/without warm_up()."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5,
+                            help="Fresh processes per scenario (median is reported).")
+
+    def _run(self, code):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE="webapp.settings")
+        t0 = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", code], cwd=settings.BASE_DIR, env=env,
+                             check=True, capture_output=True, text=True).stdout
+        return time.perf_counter() - t0, out
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+
+        self.stdout.write("manage.py check (median wall time, s)")
+        for label, preload in (("eager", EAGER_IMPORTS), ("lazy", "")):
+            runs = [self._run(CHECK_SNIPPET.format(preload=preload))[0] for _ in range(repeat)]
+            self.stdout.write(f"  {label:<6} {statistics.median(runs):.3f}")
+
+        self.stdout.write("first request, 50 objects x 12 h @ 10 min "
+                          "(median s: setup / warm_up / first compute)")
+        for label, preload, warm in (("eager", EAGER_IMPORTS, False),
+                                     ("lazy", "", False),
+                                     ("warmed", "", True)):
+            rows = []
+            for _ in range(repeat):
+                _, out = self._run(FIRST_REQUEST_SNIPPET.format(preload=preload, warm=warm))
+                rows.append([float(x) for x in out.split()])
+            setup, warm_s, first = (statistics.median(col) for col in zip(*rows))
+            self.stdout.write(f"  {label:<6} {setup:.3f} / {warm_s:.3f} / {first:.3f}")
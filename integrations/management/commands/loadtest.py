@@ -0,0 +1,259 @@
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from integrations.sbdb_stub import start_stub
+
+DEFAULT_SERVERS = ("gunicorn:workers=1,threads=1", "gunicorn:workers=1,threads=8", "uvicorn:workers=1")
+DEFAULT_MIX = "events=0.7,login=0.2,register=0.1"
+EXPECTED_STATUS = {"events": 200, "login": 200, "register": 201}
+PASSWORD = "Lt-load-Passw0rd!"
+BASE_TIME = datetime(2025, 12, 1, 18, tzinfo=timezone.utc)
+# długości okna zapytania /events/ (h) i ich udział w ruchu
+SPAN_HOURS = (1, 3, 6, 12)
+SPAN_WEIGHTS = (0.3, 0.3, 0.25, 0.15)
+# linie stderr serwera pokazywane, gdy nie wystartuje
+STDERR_TAIL_LINES = 30
+
+
+def parse_server(spec):
+    """'gunicorn:workers=2,threads=4' -> ('gunicorn', {'workers': '2', 'threads': '4'})"""
+    kind, _, options = spec.partition(":")
+    params = dict(item.split("=", 1) for item in options.split(",") if item)
+    return kind, params
+
+
+def server_command(kind, params, port):
+    bind = f"127.0.0.1:{port}"
+    if kind == "runserver":
+        return [sys.executable, "manage.py", "runserver", "--noreload", bind], None
+    if kind == "gunicorn":
+        return [sys.executable, "-m", "gunicorn", "webapp.wsgi:application", "-b", bind,
+                "-w", params.get("workers", "1"), "--threads", params.get("threads", "1")], "gunicorn"
+    if kind == "uvicorn":
+        return [sys.executable, "-m", "uvicorn", "webapp.asgi:application", "--host", "127.0.0.1",
+                "--port", str(port), "--workers", params.get("workers", "1"),
+                "--log-level", "warning"], "uvicorn"
+    raise CommandError(f"unknown server kind {kind!r} (runserver, gunicorn, uvicorn)")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def log_tail(path, lines=STDERR_TAIL_LINES):
+    with open(path, "rb") as fh:
+        return b"".join(fh.readlines()[-lines:]).decode(errors="replace")
+
+
+def percentile_ms(latencies, q):
+    return float(np.percentile(latencies, q)) * 1000 if latencies else float("nan")
+
+
+class Client:
+    """One simulated user: own session, JWT and random stream."""
+
+    def __init__(self, base_url, username, seed):
+        import requests
+        self.base_url = base_url
+        self.username = username
+        self.session = requests.Session()
+        self.rng = np.random.default_rng(seed)
+        self.token = None
+        self.registered = 0
+
+    def login(self):
+        response = self.session.post(f"{self.base_url}/api/login/",
+                                     json={"username": self.username, "password": PASSWORD})
+        if response.status_code == 200:
+            self.token = response.json()["access"]
+        return response
+
+    def register(self):
+        self.registered += 1
+        name = f"{self.username}-{self.registered}"
+        return self.session.post(f"{self.base_url}/api/register/",
+                                 json={"username": name, "email": f"{name}@example.com",
+                                       "password": PASSWORD, "password2": PASSWORD})
+
+    def events(self):
+        rng = self.rng
+        begin = BASE_TIME + timedelta(days=float(rng.uniform(0, 30)), hours=float(rng.uniform(0, 6)))
+        span = float(rng.choice(SPAN_HOURS, p=SPAN_WEIGHTS))
+        payload = {"latitude": round(float(rng.uniform(-60, 70)), 4),
+                   "longitude": round(float(rng.uniform(-180, 180)), 4),
+                   "begin_time": begin.isoformat(),
+                   "end_time": (begin + timedelta(hours=span)).isoformat()}
+        response = self.session.post(f"{self.base_url}/events/", json=payload,
+                                     headers={"Authorization": f"Bearer {self.token}"})
+        if response.status_code == 401:
+            # access token expired during a long run
+            self.login()
+        return response
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test /events/, /api/login/ and /api/register/: boots the app on a "
+        "fresh SQLite DB against a local SBDB stub, drives concurrent JWT-"
+        "authenticated traffic and reports throughput, latency percentiles and "
+        "error rates per endpoint and per server (worker model) setting."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--server", action="append", dest="servers",
+                            help="Server spec, repeatable: runserver | gunicorn:workers=N,threads=M "
+                                 f"| uvicorn:workers=N (default: {', '.join(DEFAULT_SERVERS)}).")
+        parser.add_argument("--concurrency", type=int, default=16, help="Simulated users.")
+        parser.add_argument("--duration", type=float, default=30.0, help="Seconds per server.")
+        parser.add_argument("--mix", default=DEFAULT_MIX, help="Endpoint weights.")
+        parser.add_argument("--catalog-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        if importlib.util.find_spec("requests") is None:
+            raise CommandError("the load test needs the 'requests' package")
+        mix = {key: float(value) for key, value in
+               (item.split("=", 1) for item in options["mix"].split(","))}
+        unknown = set(mix) - set(EXPECTED_STATUS)
+        if unknown:
+            raise CommandError(f"unknown endpoints in --mix: {', '.join(sorted(unknown))}")
+
+        stub, sbdb_url = start_stub(catalog_size=options["catalog_size"], seed=options["seed"])
+        results = {}
+        try:
+            for spec in options["servers"] or DEFAULT_SERVERS:
+                kind, params = parse_server(spec)
+                self.stdout.write(f"== {spec}")
+                summary = self.run_server(kind, params, sbdb_url, mix, options)
+                if summary is not None:
+                    results[spec] = summary
+                    self.report(summary)
+        finally:
+            stub.shutdown()
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(results, fh, indent=2)
+
+    def run_server(self, kind, params, sbdb_url, mix, options):
+        port = free_port()
+        command, module = server_command(kind, params, port)
+        if module and importlib.util.find_spec(module) is None:
+            self.stdout.write(f"   {module} not installed, skipped")
+            return None
+
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DJANGO_SETTINGS_MODULE="webapp.settings",
+                       SKYMAP_DB_PATH=os.path.join(tmp, "loadtest.sqlite3"),
+                       SBDB_QUERY_URL=sbdb_url,
+                       # no element snapshot: every query goes to the stub
+                       SKYMAP_ELEMENT_SNAPSHOT="")
+            subprocess.run([sys.executable, "manage.py", "migrate", "--noinput", "-v", "0"],
+                           cwd=settings.BASE_DIR, env=env, check=True)
+            stderr_path = os.path.join(tmp, "server.stderr")
+            with open(stderr_path, "wb") as stderr:
+                server = subprocess.Popen(command, cwd=settings.BASE_DIR, env=env,
+                                          stdout=subprocess.DEVNULL, stderr=stderr)
+                try:
+                    base_url = f"http://127.0.0.1:{port}"
+                    self.wait_ready(base_url, server, stderr_path)
+                    return self.drive(base_url, mix, options)
+                finally:
+                    server.terminate()
+                    server.wait(timeout=30)
+
+    def wait_ready(self, base_url, server, stderr_path, timeout=60.0):
+        import requests
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"server exited with code {server.returncode}, stderr:\n"
+                                   f"{log_tail(stderr_path)}")
+            try:
+                requests.get(f"{base_url}/", timeout=1)
+                return
+            except requests.ConnectionError:
+                time.sleep(0.2)
+        raise CommandError(f"server did not start in time, stderr:\n{log_tail(stderr_path)}")
+
+    def drive(self, base_url, mix, options):
+        names = list(mix)
+        weights = np.array([mix[name] for name in names])
+        weights = weights / weights.sum()
+
+        clients = [Client(base_url, f"load{k}", options["seed"] + k)
+                   for k in range(options["concurrency"])]
+        # konta i tokeny użytkowników - poza pomiarem
+        for client in clients:
+            client.session.post(
+                f"{base_url}/api/register/",
+                json={"username": client.username, "email": f"{client.username}@example.com",
+                      "password": PASSWORD, "password2": PASSWORD})
+            if client.login().status_code != 200:
+                raise CommandError(f"could not obtain a JWT for {client.username}")
+
+        samples = defaultdict(list)
+        lock = threading.Lock()
+        deadline = time.monotonic() + options["duration"]
+
+        def user(client):
+            local = []
+            while time.monotonic() < deadline:
+                endpoint = names[client.rng.choice(len(names), p=weights)]
+                t0 = time.perf_counter()
+                try:
+                    status = getattr(client, endpoint)().status_code
+                except Exception:
+                    status = None
+                local.append((endpoint, time.perf_counter() - t0, status))
+            with lock:
+                for endpoint, latency, status in local:
+                    samples[endpoint].append((latency, status))
+
+        threads = [threading.Thread(target=user, args=(client,)) for client in clients]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        summary = {}
+        for endpoint in names:
+            rows = samples.get(endpoint, [])
+            latencies = [latency for latency, _ in rows]
+            errors = sum(1 for _, status in rows if status != EXPECTED_STATUS[endpoint])
+            summary[endpoint] = {
+                "requests": len(rows),
+                "rps": len(rows) / elapsed,
+                "p50_ms": percentile_ms(latencies, 50),
+                "p90_ms": percentile_ms(latencies, 90),
+                "p99_ms": percentile_ms(latencies, 99),
+                "max_ms": max(latencies) * 1000 if latencies else float("nan"),
+                "error_rate": errors / len(rows) if rows else 0.0,
+            }
+        return summary
+
+    def report(self, summary):
+        self.stdout.write(f"   {'endpoint':<10} {'req':>7} {'req/s':>8} {'p50 ms':>8} "
+                          f"{'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>7}")
+        for endpoint, row in summary.items():
+            self.stdout.write(f"   {endpoint:<10} {row['requests']:>7} {row['rps']:>8.1f} "
+                              f"{row['p50_ms']:>8.1f} {row['p90_ms']:>8.1f} {row['p99_ms']:>8.1f} "
+                              f"{row['max_ms']:>8.1f} {row['error_rate']:>7.1%}")
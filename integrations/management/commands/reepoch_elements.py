@@ -0,0 +1,35 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from integrations.elements import build_snapshot, recent_epoch_jd, save_snapshot
+from integrations.views import fetch_sbdb_objects
+
+
+class Command(BaseCommand):
+    help = (
+        "Fetch the SBDB element catalog, re-epoch it to a recent reference epoch "
+        "and store it with precomputed invariants (mean motion, rotation matrix, "
+        "true-anomaly factor) in settings.INTEGRATIONS_ELEMENT_SNAPSHOT. "
+        "Run periodically (e.g. daily from cron); workers pick up the new file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=5000, help="Objects to fetch from SBDB.")
+        parser.add_argument("--ref-epoch", type=float,
+                            help="Reference epoch (JD); default: the most recent 0h UTC.")
+        parser.add_argument("--output", help="Snapshot path (default: the setting).")
+
+    def handle(self, *args, **options):
+        path = options["output"] or getattr(settings, "INTEGRATIONS_ELEMENT_SNAPSHOT", None)
+        if not path:
+            raise CommandError("no output path: set INTEGRATIONS_ELEMENT_SNAPSHOT or pass --output")
+        ref_epoch = options["ref_epoch"] or recent_epoch_jd()
+
+        t0 = time.perf_counter()
+        objects = fetch_sbdb_objects(options["limit"])
+        snapshot = build_snapshot(objects, ref_epoch)
+        save_snapshot(snapshot, path)
+        self.stdout.write(f"{snapshot['name'].size}/{len(objects)} objects re-epoched to "
+                          f"JD {ref_epoch} -> {path} ({time.perf_counter() - t0:.1f} s)")
@@ -0,0 +1,101 @@
+# Planowanie wykonania zapytań widoczności w zadanym budżecie pamięci.
+#
+# Silnik liczy obiekty w partiach (chunkach) po obiektach i po czasie; tutaj
+# wybieramy rozmiary partii tak, by szczytowe zużycie pamięci jednego
+# zapytania (katalog x długi przedział czasu) mieściło się w budżecie.
+from collections import namedtuple
+
+import numpy as np
+
+PRECISIONS = {
+    "float64": np.float64,
+    "float32": np.float32,
+}
+
+# Szacunkowe bajty na jedną próbkę czasu (patrz integrations/views.py i kernels.py).
+# Siatka całego zapytania trzymana do końca: times_jd.
+GRID_BYTES_PER_SAMPLE = 8
+# Jedna partia czasu: earth_heliocentric_positions (jak propagacja obiektu,
+# niżej) i TopocentricFrame: ex, ey, ez (float64) oraz |Ziemia|, LST (dtype).
+FRAME_FLOAT64_ARRAYS = 3
+FRAME_ARRAYS = 2
+# Jeden wątek: orbit_xyz_vectorized + solve_kepler_vec (zawsze float64) ...
+PROPAGATION_BYTES_PER_SAMPLE = 20 * 8
+# ... bufory (4, N) + (5, N) z TopocentricFrame.buffers() ...
+TOPOCENTRIC_ARRAYS = 9
+# ... oraz maski (bool) i diff okien (int8).
+MASK_BYTES_PER_SAMPLE = 4
+
+DEFAULT_MEMORY_BUDGET = 256 * 2**20
+
+MIN_TIMES_PER_CHUNK = 64
+MAX_OBJECTS_PER_CHUNK = 256
+
+ExecutionPlan = namedtuple("ExecutionPlan", ["objects_per_chunk", "times_per_chunk", "dtype"])
+
+
+class MemoryBudgetExceeded(Exception):
+    """The request cannot be chunked to fit the memory budget (time range too long)."""
+
+
+def precision_dtype(precision):
+    """numpy dtype for a precision name ("float64" or "float32")."""
+    try:
+        return PRECISIONS[precision]
+    except KeyError:
+        raise ValueError(f"precision must be one of {sorted(PRECISIONS)}, got {precision!r}")
+
+
+def plan_execution(n_objects, n_times, max_workers=8, memory_budget=DEFAULT_MEMORY_BUDGET,
+                   precision="float64", retained_bytes_per_sample=0):
+    """
+    Choose chunk sizes over objects and time samples so that one request
+    stays within memory_budget bytes.
+
+    n_objects, n_times: size of the request (catalog x time grid)
+    max_workers: objects in flight at once (one thread each)
+    precision: dtype of the topocentric stage, see precision_dtype()
+    retained_bytes_per_sample: bytes per object and sample of the whole
+        grid kept until a chunk of objects is consumed (e.g. streamed
+        tracks); 0 when only the window boundaries are kept
+
+    Returns ExecutionPlan(objects_per_chunk, times_per_chunk, dtype).
+    Raises MemoryBudgetExceeded when the grid, a MIN_TIMES_PER_CHUNK time
+    chunk and (with retained_bytes_per_sample) one object's retained
+    samples do not fit; call it before allocating anything of n_times.
+    """
+    dtype = precision_dtype(precision)
+    itemsize = np.dtype(dtype).itemsize
+    n_objects = max(int(n_objects), 1)
+    n_times = max(int(n_times), 1)
+    workers = max(min(int(max_workers), n_objects), 1)
+
+    available = memory_budget - n_times * GRID_BYTES_PER_SAMPLE
+    if retained_bytes_per_sample:
+        # połowa na obliczenia, połowa na wyniki trzymane do końca partii
+        compute_budget = available // 2
+        retained_budget = available - compute_budget
+    else:
+        compute_budget = available
+        retained_budget = 0
+
+    per_sample = (PROPAGATION_BYTES_PER_SAMPLE
+                  + FRAME_FLOAT64_ARRAYS * 8 + FRAME_ARRAYS * itemsize
+                  + workers * (PROPAGATION_BYTES_PER_SAMPLE
+                               + TOPOCENTRIC_ARRAYS * itemsize
+                               + MASK_BYTES_PER_SAMPLE))
+    per_object = n_times * retained_bytes_per_sample
+    if (compute_budget < min(MIN_TIMES_PER_CHUNK, n_times) * per_sample
+            or retained_budget < per_object):
+        raise MemoryBudgetExceeded(
+            f"{n_times} time samples do not fit in a memory budget of {memory_budget} bytes")
+
+    times_per_chunk = int(min(max(compute_budget // per_sample, MIN_TIMES_PER_CHUNK), n_times))
+
+    if retained_bytes_per_sample:
+        objects_per_chunk = min(retained_budget // per_object, MAX_OBJECTS_PER_CHUNK)
+    else:
+        objects_per_chunk = max(MAX_OBJECTS_PER_CHUNK, workers)
+    objects_per_chunk = int(min(max(objects_per_chunk, 1), n_objects))
+
+    return ExecutionPlan(objects_per_chunk, times_per_chunk, dtype)
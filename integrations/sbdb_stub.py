@@ -0,0 +1,75 @@
+# Lokalny zamiennik JPL SBDB query API do testów obciążeniowych
+# (manage.py loadtest). Zwraca deterministyczny, syntetyczny katalog
+# planetoid w formacie sbdb_query.api: {"fields": [...], "data": [[...], ...]}.
+# synthetic_catalog() jest też jedynym źródłem syntetycznych obiektów dla
+# benchmarków (manage.py bench_*) i testów.
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+FIELDS = ["name", "a", "e", "i", "om", "w", "ma", "epoch"]
+DEFAULT_CATALOG_SIZE = 5000
+
+
+def synthetic_catalog(count, seed=0):
+    """
+    Deterministic main-belt-like catalog: one dict per object with the
+    FIELDS keys, values as strings like in the SBDB response. The single
+    source of synthetic objects for the stub, the benchmarks and the tests.
+    """
+    rng = np.random.default_rng(seed)
+    objects = []
+    for k in range(count):
+        objects.append({
+            "name": f"{k + 1} Stub ({2000 + k % 25} SB{k % 100})",
+            "a": f"{2.1 + 1.2 * rng.random():.8f}",
+            "e": f"{0.25 * rng.random():.8f}",
+            "i": f"{25.0 * rng.random():.6f}",
+            "om": f"{360.0 * rng.random():.6f}",
+            "w": f"{360.0 * rng.random():.6f}",
+            "ma": f"{360.0 * rng.random():.6f}",
+            "epoch": "2460600.5",
+        })
+    return objects
+
+
+def synthetic_rows(count, seed=0):
+    """synthetic_catalog() as SBDB "data" rows (values in FIELDS order)."""
+    return [[obj[field] for field in FIELDS] for obj in synthetic_catalog(count, seed)]
+
+
+class SBDBStubHandler(BaseHTTPRequestHandler):
+    rows = []
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        try:
+            limit = int(query.get("limit", [len(self.rows)])[0])
+        except ValueError:
+            limit = len(self.rows)
+        body = json.dumps({"signature": {"source": "SBDB stub", "version": "1.0"},
+                           "count": min(limit, len(self.rows)),
+                           "fields": FIELDS,
+                           "data": self.rows[:limit]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub(host="127.0.0.1", port=0, catalog_size=DEFAULT_CATALOG_SIZE, seed=0):
+    """
+    Serve the stub in a daemon thread. Returns (server, url) where url is the
+    value for settings.SBDB_QUERY_URL; stop with server.shutdown().
+    """
+    handler = type("Handler", (SBDBStubHandler,), {"rows": synthetic_rows(catalog_size, seed)})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/sbdb_query.api"
@@ -1,3 +1,451 @@
-from django.test import TestCase
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from integrations.elements import (SNAPSHOT_ARRAYS, build_snapshot, save_snapshot,
+                                   snapshot_objects, snapshot_rows)
+from integrations.kernels import (TOLERANCE_DEG, TopocentricFrame, _numpy_kernel, angle_diff,
+                                  compute_radec_alt_fast)
+from integrations.planner import MIN_TIMES_PER_CHUNK, MemoryBudgetExceeded, plan_execution
+from integrations.sbdb_stub import synthetic_catalog
+from integrations import views
+from integrations.views import (ORBIT_KEYS, columns_to_rows, compute_radec_alt_for_vector,
+                                douglas_peucker_indices, earth_heliocentric_positions,
+                                make_time_grid, orbit_xyz_from_invariants,
+                                orbit_xyz_vectorized, positions_at, query_objects,
+                                tracks_for_many, visibility_columns_for_many)
+
+LATITUDE, LONGITUDE = 52.23, 21.01
+HAS_NUMBA = importlib.util.find_spec("numba") is not None
+
+
+def orbit_positions(orb, times_jd):
+    return orbit_xyz_vectorized(*[float(orb[key]) for key in ORBIT_KEYS], times_jd)[:3]
+
+
+class ColumnsToRowsTests(SimpleTestCase):
+
+    def columns(self, dtype):
+        return {"name": ["a", "b"],
+                "latitude": np.array([0.1, 359.99], dtype=dtype),
+                "longitude": np.array([-12.3, 45.6], dtype=dtype),
+                "begin_jd": np.array([2461011.25, 2461011.5]),
+                "end_jd": np.array([2461011.375, 2461011.625])}
+
+    def test_rows_match_sbo_to_dict_shape(self):
+        rows = columns_to_rows(self.columns(np.float64))
+        self.assertEqual(rows[0], {"name": "a", "latitude": 0.1, "longitude": -12.3,
+                                   "begin_time": "2025-12-01 18:00:00.000",
+                                   "end_time": "2025-12-01 21:00:00.000"})
+        self.assertEqual(rows[1]["begin_time"], "2025-12-02 00:00:00.000")
+
+    def test_float32_columns_have_no_float64_noise(self):
+        rows = columns_to_rows(self.columns(np.float32))
+        self.assertEqual([row["latitude"] for row in rows], [0.1, 359.99])
+        self.assertEqual([row["longitude"] for row in rows], [-12.3, 45.6])
+
+    def test_empty_columns(self):
+        columns = self.columns(np.float64)
+        columns = {key: value[:0] for key, value in columns.items()}
+        self.assertEqual(columns_to_rows(columns), [])
+
+
+class DouglasPeuckerTests(SimpleTestCase):
+
+    def test_endpoints_always_kept(self):
+        rng = np.random.default_rng(0)
+        x = np.cumsum(rng.random(200))
+        y = rng.normal(size=200)
+        for tolerance in (0.01, 0.5, 100.0):
+            keep = douglas_peucker_indices(x, y, tolerance)
+            self.assertEqual(keep[0], 0)
+            self.assertEqual(keep[-1], 199)
+            self.assertTrue(np.all(np.diff(keep) > 0))
+
+    def test_non_positive_tolerance_keeps_every_sample(self):
+        x = np.linspace(0.0, 1.0, 50)
+        for tolerance in (0.0, -1.0):
+            np.testing.assert_array_equal(douglas_peucker_indices(x, x, tolerance),
+                                          np.arange(50))
+
+    def test_straight_line_collapses_to_endpoints(self):
+        x = np.linspace(0.0, 10.0, 101)
+        np.testing.assert_array_equal(douglas_peucker_indices(x, 2.0 * x + 1.0, 1e-9), [0, 100])
+
+    def test_corner_is_kept(self):
+        x = np.r_[np.arange(10.0), np.full(10, 9.0)]
+        y = np.r_[np.zeros(10), np.arange(1.0, 11.0)]
+        np.testing.assert_array_equal(douglas_peucker_indices(x, y, 0.1), [0, 9, 19])
+
+    def test_short_tracks(self):
+        for n in (0, 1, 2):
+            np.testing.assert_array_equal(douglas_peucker_indices(np.zeros(n), np.zeros(n), 1.0),
+                                          np.arange(n))
+
+    def test_extra_series_corner_is_kept(self):
+        # prosta na niebie, ale wysokość rośnie i opada (wschód / zachód)
+        x = np.linspace(0.0, 1.0, 21)
+        z = np.r_[np.arange(0.0, 11.0), np.arange(9.0, -1.0, -1.0)]
+        np.testing.assert_array_equal(douglas_peucker_indices(x, x, 0.1), [0, 20])
+        np.testing.assert_array_equal(douglas_peucker_indices(x, x, 0.1, z=z), [0, 10, 20])
+
+    def test_interpolated_altitude_within_tolerance(self):
+        start, end = "2025-12-01 00:00:00", "2025-12-04 00:00:00"
+        objects = synthetic_catalog(20)
+        _, full = tracks_for_many(objects, start, end, LATITUDE, LONGITUDE)
+        full = {track["name"]: track["alt"] for track in full}
+        for tolerance in (0.1, 0.5):
+            _, tracks = tracks_for_many(objects, start, end, LATITUDE, LONGITUDE,
+                                        tolerance_deg=tolerance)
+            for track in tracks:
+                alt = full[track["name"]]
+                self.assertLess(track["index"].size, alt.size)
+                interpolated = np.interp(np.arange(alt.size), track["index"], track["alt"])
+                self.assertLessEqual(float(np.max(np.abs(interpolated - alt))), tolerance)
+
+
+class QueryObjectsTests(SimpleTestCase):
+
+    def setUp(self):
+        self.catalog = synthetic_catalog(20)
+        patcher = mock.patch("integrations.elements.snapshot_objects", return_value=self.catalog)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_limit(self):
+        self.assertEqual(query_objects(5), self.catalog[:5])
+
+    def test_names_filtered_before_limit(self):
+        names = [self.catalog[15]["name"], self.catalog[18]["name"], "no such object"]
+        self.assertEqual(query_objects(1, names), [self.catalog[15]])
+        self.assertEqual(query_objects(5, names), [self.catalog[15], self.catalog[18]])
+
+
+class TopocentricKernelTests(SimpleTestCase):
+    """integrations.kernels against the reference compute_radec_alt_for_vector."""
+
+    # float32 frame: ~1e-5 deg typical; elongation/altitude lose precision
+    # next to 0/180 and +-90 deg (arccos/arcsin), so those samples are excluded
+    FLOAT32_TOLERANCE_DEG = 1e-3
+    FLOAT32_MIN_MARGIN_DEG = 1.0
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from astropy.coordinates import EarthLocation
+        import astropy.units as u
+
+        cls.times = make_time_grid("2025-12-01 00:00:00", "2025-12-03 00:00:00", 10)
+        times_jd = cls.times.jd
+        cls.earth_xyz = earth_heliocentric_positions(times_jd)
+        cls.location = EarthLocation(lat=LATITUDE*u.deg, lon=LONGITUDE*u.deg, height=100*u.m)
+        cls.frames = {dtype: TopocentricFrame.from_location(cls.earth_xyz, times_jd,
+                                                             cls.location, dtype)
+                      for dtype in (np.float64, np.float32)}
+
+        cls.positions = [orbit_positions(orb, times_jd) for orb in synthetic_catalog(20)]
+        # geocentric direction sweeping through RA 0/360 (exactly 0 in the middle)
+        ra = np.linspace(-0.01, 0.01, times_jd.size)
+        ra[times_jd.size // 2] = 0.0
+        cls.ra_wrap = (cls.earth_xyz[0] + np.cos(ra), cls.earth_xyz[1] + np.sin(ra),
+                       cls.earth_xyz[2] + 0.2)
+        cls.positions.append(cls.ra_wrap)
+
+    def reference(self, X, Y, Z):
+        return np.array(compute_radec_alt_for_vector(X, Y, Z, self.earth_xyz, self.times,
+                                                     self.location))
+
+    def numpy_kernel(self, X, Y, Z, dtype):
+        frame = self.frames[dtype]
+        out = np.empty((4, frame.size), dtype=dtype)
+        _numpy_kernel(X, Y, Z, frame, out, np.empty((5, frame.size), dtype=dtype))
+        return out
+
+    def assert_float64_close(self, compute):
+        for X, Y, Z in self.positions:
+            diff = angle_diff(np.asarray(compute(X, Y, Z), dtype=np.float64),
+                              self.reference(X, Y, Z))
+            self.assertLessEqual(float(diff.max()), TOLERANCE_DEG)
+
+    def assert_float32_close(self, compute):
+        for X, Y, Z in self.positions:
+            expected = self.reference(X, Y, Z)
+            diff = angle_diff(np.asarray(compute(X, Y, Z), dtype=np.float64), expected)
+            margin = self.FLOAT32_MIN_MARGIN_DEG
+            regular = ((np.abs(expected[2]) < 90.0 - margin)
+                       & (expected[3] > margin) & (expected[3] < 180.0 - margin))
+            self.assertLessEqual(float(diff[:2].max()), self.FLOAT32_TOLERANCE_DEG)
+            self.assertLessEqual(float(diff[2:, regular].max()), self.FLOAT32_TOLERANCE_DEG)
+
+    def test_ra_wrap_case_crosses_zero(self):
+        ra = self.reference(*self.ra_wrap)[0]
+        self.assertTrue(np.any(ra > 359.0) and np.any(ra < 1.0))
+
+    def test_numpy_kernel_float64(self):
+        self.assert_float64_close(lambda X, Y, Z: self.numpy_kernel(X, Y, Z, np.float64))
+
+    def test_numpy_kernel_float32(self):
+        self.assert_float32_close(lambda X, Y, Z: self.numpy_kernel(X, Y, Z, np.float32))
+
+    def test_compute_radec_alt_fast_numpy_path(self):
+        frame = self.frames[np.float64]
+        self.assert_float64_close(
+            lambda X, Y, Z: np.array(compute_radec_alt_fast(X, Y, Z, frame, use_jit=False)))
+
+    @skipUnless(HAS_NUMBA, "numba is not installed")
+    def test_jit_kernel_float64(self):
+        frame = self.frames[np.float64]
+        self.assert_float64_close(
+            lambda X, Y, Z: np.array(compute_radec_alt_fast(X, Y, Z, frame, use_jit=True)))
+
+    @skipUnless(HAS_NUMBA, "numba is not installed")
+    def test_jit_kernel_float32(self):
+        frame = self.frames[np.float32]
+        self.assert_float32_close(
+            lambda X, Y, Z: np.array(compute_radec_alt_fast(X, Y, Z, frame, use_jit=True)))
+
+
+class PrecisionAndChunkingTests(SimpleTestCase):
+    """float32 mode against float64, and memory-budgeted chunking against one chunk."""
+
+    START, END = "2025-12-01 00:00:00", "2025-12-04 00:00:00"
+    CADENCE_MIN = 10
+    UNLIMITED = 2**40
+    # float32: angles within 1e-3 deg (away from the arccos/arcsin edges),
+    # window boundaries within one sample, and at most 1 object in 50 with a
+    # different window count (a sample landing within ~1e-5 deg of a threshold)
+    FLOAT32_TOLERANCE_DEG = 1e-3
+    FLOAT32_MIN_MARGIN_DEG = 1.0
+    MAX_WINDOW_SHIFT_SAMPLES = 1
+    MAX_SPLIT_WINDOW_OBJECTS = 1
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.objects = synthetic_catalog(50)
+        cls.times_jd = make_time_grid(cls.START, cls.END, cls.CADENCE_MIN).jd
+        cls.windows = {precision: cls.visibility(precision, cls.UNLIMITED)
+                       for precision in ("float64", "float32")}
+
+    @classmethod
+    def visibility(cls, precision, memory_budget):
+        return visibility_columns_for_many(cls.objects, cls.START, cls.END, LATITUDE, LONGITUDE,
+                                           cadence_min=cls.CADENCE_MIN, min_alt_deg=10.0,
+                                           min_elong_deg=22.0, precision=precision,
+                                           memory_budget=memory_budget)
+
+    def tracks(self, memory_budget, tolerance_deg=0.0):
+        times_jd, tracks = tracks_for_many(self.objects, self.START, self.END, LATITUDE, LONGITUDE,
+                                           cadence_min=self.CADENCE_MIN, min_alt_deg=10.0,
+                                           min_elong_deg=22.0, tolerance_deg=tolerance_deg,
+                                           memory_budget=memory_budget)
+        return times_jd, list(tracks)
+
+    def windows_by_name(self, columns):
+        found = {}
+        for name, begin, end in zip(columns["name"], columns["begin_jd"], columns["end_jd"]):
+            found.setdefault(name, []).append((begin, end))
+        return found
+
+    def test_grid_matches_make_time_grid(self):
+        times_jd, _ = self.tracks(self.UNLIMITED)
+        np.testing.assert_array_equal(times_jd, self.times_jd)
+
+    def test_float32_angle_error(self):
+        earth_xyz = earth_heliocentric_positions(self.times_jd)
+        frames = {dtype: TopocentricFrame(earth_xyz, self.times_jd, LATITUDE, LONGITUDE, dtype)
+                  for dtype in (np.float64, np.float32)}
+        margin = self.FLOAT32_MIN_MARGIN_DEG
+        for orb in self.objects:
+            X, Y, Z = orbit_positions(orb, self.times_jd)
+            expected = np.array(compute_radec_alt_fast(X, Y, Z, frames[np.float64]))
+            got = np.array(compute_radec_alt_fast(X, Y, Z, frames[np.float32]), dtype=np.float64)
+            diff = angle_diff(got, expected)
+            regular = ((np.abs(expected[2]) < 90.0 - margin)
+                       & (expected[3] > margin) & (expected[3] < 180.0 - margin))
+            self.assertLessEqual(float(diff[:2].max()), self.FLOAT32_TOLERANCE_DEG)
+            self.assertLessEqual(float(diff[2:, regular].max()), self.FLOAT32_TOLERANCE_DEG)
+
+    def test_float32_window_boundaries(self):
+        reference = self.windows_by_name(self.windows["float64"])
+        low = self.windows_by_name(self.windows["float32"])
+        self.assertGreater(len(reference), 0)
+        step = self.CADENCE_MIN / (24 * 60)
+        split, max_shift = 0, 0
+        for name in set(reference) | set(low):
+            a, b = reference.get(name, []), low.get(name, [])
+            if len(a) != len(b):
+                split += 1
+                continue
+            for (b0, e0), (b1, e1) in zip(a, b):
+                max_shift = max(max_shift, round(max(abs(b1 - b0), abs(e1 - e0)) / step))
+        self.assertLessEqual(max_shift, self.MAX_WINDOW_SHIFT_SAMPLES)
+        self.assertLessEqual(split, self.MAX_SPLIT_WINDOW_OBJECTS)
+
+    def test_chunked_windows_match_unchunked(self):
+        budget = 256 * 2**10
+        plan = plan_execution(len(self.objects), self.times_jd.size, memory_budget=budget)
+        self.assertLess(plan.times_per_chunk, self.times_jd.size)
+        for precision in ("float64", "float32"):
+            expected = self.windows[precision]
+            got = self.visibility(precision, budget)
+            self.assertEqual(got["name"], expected["name"])
+            np.testing.assert_array_equal(got["begin_jd"], expected["begin_jd"])
+            np.testing.assert_array_equal(got["end_jd"], expected["end_jd"])
+            np.testing.assert_allclose(got["latitude"], expected["latitude"], atol=TOLERANCE_DEG)
+            np.testing.assert_allclose(got["longitude"], expected["longitude"], atol=TOLERANCE_DEG)
+
+    def test_chunked_tracks_one_per_object(self):
+        budget = 512 * 2**10
+        plan = plan_execution(len(self.objects), self.times_jd.size, memory_budget=budget,
+                              retained_bytes_per_sample=8 + 3 * 8)
+        self.assertLess(plan.times_per_chunk, self.times_jd.size)
+        self.assertLess(plan.objects_per_chunk, len(self.objects))
+
+        _, expected = self.tracks(self.UNLIMITED)
+        _, got = self.tracks(budget)
+        self.assertGreater(len(expected), 0)
+        names = [track["name"] for track in got]
+        self.assertEqual(names, [track["name"] for track in expected])
+        self.assertEqual(len(names), len(set(names)))
+        for a, b in zip(got, expected):
+            np.testing.assert_array_equal(a["index"], np.arange(self.times_jd.size))
+            np.testing.assert_array_equal(a["index"], b["index"])
+            for key in ("ra", "dec", "alt"):
+                np.testing.assert_allclose(a[key], b[key], atol=TOLERANCE_DEG)
+
+        _, simplified = self.tracks(budget, tolerance_deg=0.05)
+        self.assertEqual([track["name"] for track in simplified], names)
+        for track in simplified:
+            self.assertEqual(track["index"][0], 0)
+            self.assertEqual(track["index"][-1], self.times_jd.size - 1)
+
+    def test_too_long_range_is_rejected(self):
+        budget = 2**20
+        n_times = budget // 8
+        with self.assertRaises(MemoryBudgetExceeded):
+            plan_execution(1, n_times, memory_budget=budget)
+        # the grid fits, but one object's whole-range track does not
+        with self.assertRaises(MemoryBudgetExceeded):
+            plan_execution(1, 20000, memory_budget=budget, retained_bytes_per_sample=64)
+        plan = plan_execution(1, MIN_TIMES_PER_CHUNK, memory_budget=budget)
+        self.assertEqual(plan.times_per_chunk, MIN_TIMES_PER_CHUNK)
+
+        # rejected before any Earth vectors are computed
+        with mock.patch("integrations.views.earth_heliocentric_positions") as earth:
+            with self.assertRaises(MemoryBudgetExceeded):
+                visibility_columns_for_many(self.objects, "2000-01-01", "2030-01-01",
+                                            LATITUDE, LONGITUDE, memory_budget=budget)
+        earth.assert_not_called()
+
+
+class ElementSnapshotTests(SimpleTestCase):
+
+    REF_EPOCH = 2461010.5
+    # AU; re-epoching only regroups M0 + n (t - epoch) into ma_ref + n (t - ref)
+    POSITION_TOLERANCE_AU = 1e-10
+
+    def setUp(self):
+        self.catalog = synthetic_catalog(30)
+        self.times_jd = self.REF_EPOCH + np.linspace(-60.0, 60.0, 500)
+
+    def test_invariants_reproduce_orbit_xyz_vectorized(self):
+        rows = snapshot_rows(build_snapshot(self.catalog, self.REF_EPOCH))
+        self.assertEqual(len(rows), len(self.catalog))
+        for orb, row in zip(self.catalog, rows):
+            expected = orbit_xyz_vectorized(*[float(orb[key]) for key in ORBIT_KEYS],
+                                            self.times_jd)
+            got = orbit_xyz_from_invariants(row["a"], row["e"], row["ma_ref"], row["n"],
+                                            row["nu_factor"], row["rotation"], row["epoch"],
+                                            self.times_jd)
+            # the re-epoched elements alone give the same orbit too
+            reepoched = orbit_xyz_vectorized(*[float(row[key]) for key in ORBIT_KEYS],
+                                             self.times_jd)
+            for a, b, c in zip(got, expected, reepoched):
+                np.testing.assert_allclose(a, b, rtol=0, atol=self.POSITION_TOLERANCE_AU)
+                np.testing.assert_allclose(c, b, rtol=0, atol=self.POSITION_TOLERANCE_AU)
+
+    def test_invalid_rows_are_dropped(self):
+        catalog = self.catalog[:3] + [dict(self.catalog[3], e="1.2"), dict(self.catalog[4], a="-1"),
+                                      {"name": "no elements"}, dict(self.catalog[5], ma="n/a")]
+        snapshot = build_snapshot(catalog, self.REF_EPOCH)
+        self.assertEqual(snapshot["name"].tolist(), [orb["name"] for orb in self.catalog[:3]])
+
+    def test_round_trip_through_a_file(self):
+        snapshot = build_snapshot(self.catalog, self.REF_EPOCH)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "elements.npz")
+            save_snapshot(snapshot, path)
+            self.assertEqual(os.listdir(tmp), ["elements.npz"])
+
+            rows = snapshot_objects(path)
+            self.assertIs(snapshot_objects(path), rows)
+            self.assertEqual([row["name"] for row in rows], [orb["name"] for orb in self.catalog])
+            for k, row in enumerate(rows):
+                self.assertEqual(set(row), set(SNAPSHOT_ARRAYS) | {"name"})
+                for key in SNAPSHOT_ARRAYS:
+                    np.testing.assert_array_equal(row[key], snapshot[key][k])
+
+            # a rebuilt file is picked up without a restart
+            save_snapshot(build_snapshot(self.catalog[:5], self.REF_EPOCH + 1), path)
+            self.assertEqual(len(snapshot_objects(path)), 5)
+
+        self.assertIsNone(snapshot_objects(path))
+        self.assertIsNone(snapshot_objects(""))
+
+    def test_positions_at_uses_the_invariants(self):
+        rows = snapshot_rows(build_snapshot(self.catalog, self.REF_EPOCH))
+        instant = "2025-12-01 20:00:00"
+        expected, jd = positions_at(self.catalog, instant, LATITUDE, LONGITUDE)
+        with mock.patch("integrations.views.orbit_xyz_from_invariants",
+                        wraps=orbit_xyz_from_invariants) as from_invariants:
+            got, got_jd = positions_at(rows, instant, LATITUDE, LONGITUDE)
+        # one vectorized call for the whole catalog
+        from_invariants.assert_called_once()
+        self.assertEqual(got_jd, jd)
+        self.assertEqual(got["name"], expected["name"])
+        for key in ("ra", "dec", "alt", "az", "elong"):
+            diff = np.abs(got[key] - expected[key])
+            if key in ("ra", "az"):
+                diff = np.minimum(diff, 360.0 - diff)
+            self.assertLessEqual(float(diff.max()), TOLERANCE_DEG)
+
+        # mixed catalogs keep the order of objects
+        mixed = [rows[0], self.catalog[1], rows[2]]
+        got, _ = positions_at(mixed, instant, LATITUDE, LONGITUDE)
+        self.assertEqual(got["name"], expected["name"][:3])
+        np.testing.assert_allclose(got["ra"], expected["ra"][:3], rtol=0, atol=TOLERANCE_DEG)
+
+
+class StartupTests(SimpleTestCase):
+
+    def test_url_import_does_not_load_astropy_or_pandas(self):
+        # osobny proces: w tym astropy jest już zaimportowane przez inne testy
+        snippet = ("import sys, django; django.setup(); import webapp.urls; "
+                   "print('\\n'.join(sys.modules))")
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE="webapp.settings")
+        result = subprocess.run([sys.executable, "-c", snippet], cwd=settings.BASE_DIR, env=env,
+                                capture_output=True, text=True, check=True)
+        loaded = [name for name in result.stdout.split()
+                  if name.startswith(("astropy", "pandas"))]
+        self.assertEqual(loaded, [])
+
+    def test_warm_up_is_offline_and_runs_once(self):
+        offline = OSError("network access during warm_up")
+        with mock.patch.object(views, "_warmed_up", False), \
+                mock.patch("socket.socket.connect", side_effect=offline), \
+                mock.patch("socket.create_connection", side_effect=offline):
+            views.warm_up()
+            self.assertTrue(views._warmed_up)
+            with mock.patch("integrations.views.visibility_for_many") as rows, \
+                    mock.patch("integrations.views.visibility_columns_for_many") as columns:
+                views.warm_up()
+            rows.assert_not_called()
+            columns.assert_not_called()
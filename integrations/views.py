@@ -1,24 +1,30 @@
-from django.shortcuts import render
 # fast_batch_visibility.py
+#
+# astropy i requests są importowane leniwie (wewnątrz funkcji), bo ten moduł
+# jest ładowany przez webapp/urls.py w każdym procesie Django - także przy
+# `manage.py check`, migracjach i testach. Koszt ich importu ponosi dopiero
+# pierwsze zapytanie albo warm_up() wywołane przy starcie workera.
+import json
+from urllib.parse import quote
+
 import numpy as np
-import requests
-import pandas as pd
 from integrations.models import SBO
-from astropy.time import Time
-from astropy.coordinates import EarthLocation
-import astropy.units as u
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from astropy.constants import G, M_sun
+from integrations.kernels import TopocentricFrame, azimuth_deg, compute_radec_alt_fast
+from integrations.planner import DEFAULT_MEMORY_BUDGET, plan_execution, precision_dtype
+from concurrent.futures import ThreadPoolExecutor
 
 # ---------- KONWERSJE / STAŁE ----------
 DEG2RAD = np.pi/180.0
 RAD2DEG = 180.0/np.pi
 DAY2SEC = 86400.0
-# mu in AU^3 / day^2
-_mu = (G * M_sun).to(u.AU**3 / u.day**2).value
+AU_M = 1.495978707e11           # IAU 2012, m
+GM_SUN = 1.3271244e20           # IAU 2015 nominal, m^3 / s^2
+# mu in AU^3 / day^2; equals (G * M_sun).to(u.AU**3 / u.day**2) from astropy.constants
+_mu = GM_SUN * DAY2SEC**2 / AU_M**3
 
 # ---------- HELPERY (wektorowe) ----------
 def make_time_grid(start_time, end_time, cadence_min):
+    from astropy.time import Time
     t0 = Time(start_time).jd
     t1 = Time(end_time).jd
     step = cadence_min / (24*60)
@@ -75,6 +81,63 @@ def orbit_xyz_vectorized(a_AU, e, inc_deg, raan_deg, argp_deg, M0_deg, epoch_jd,
 
     return X, Y, Z, r
 
+# ---------- NIEZMIENNIKI ELEMENTÓW (migawka katalogu) ----------
+def element_invariants(a_AU, e, inc_deg, raan_deg, argp_deg, M0_deg, epoch_jd, ref_epoch_jd):
+    """
+    Re-epoch orbits to ref_epoch_jd and precompute what orbit_xyz_vectorized
+    otherwise derives on every call. Arguments may be arrays (one entry per
+    object). Two-body elements do not change, only the mean anomaly moves.
+
+    Returns dict of arrays:
+      ma_ref    mean anomaly at ref_epoch_jd (rad, 0..2pi)
+      n         mean motion (rad/day)
+      nu_factor sqrt((1+e)/(1-e)), for the true anomaly from E
+      rotation  (..., 3, 2) orbital-plane -> heliocentric rotation (P, Q columns)
+    """
+    inc = np.asarray(inc_deg, dtype=np.float64) * DEG2RAD
+    raan = np.asarray(raan_deg, dtype=np.float64) * DEG2RAD
+    argp = np.asarray(argp_deg, dtype=np.float64) * DEG2RAD
+    a = np.asarray(a_AU, dtype=np.float64)
+    e = np.asarray(e, dtype=np.float64)
+
+    n = np.sqrt(_mu / (a**3))  # rad/day
+    ma_ref = (np.asarray(M0_deg, dtype=np.float64) * DEG2RAD
+              + n * (ref_epoch_jd - np.asarray(epoch_jd, dtype=np.float64))) % (2*np.pi)
+
+    cosO = np.cos(raan); sinO = np.sin(raan)
+    cosi = np.cos(inc); sini = np.sin(inc)
+    cosw = np.cos(argp); sinw = np.sin(argp)
+    rotation = np.stack([
+        np.stack([cosO*cosw - sinO*sinw*cosi, -cosO*sinw - sinO*cosw*cosi], axis=-1),
+        np.stack([sinO*cosw + cosO*sinw*cosi, -sinO*sinw + cosO*cosw*cosi], axis=-1),
+        np.stack([sini * sinw, sini * cosw], axis=-1),
+    ], axis=-2)
+
+    return {"ma_ref": ma_ref, "n": n, "nu_factor": np.sqrt((1+e)/(1-e)), "rotation": rotation}
+
+def orbit_xyz_from_invariants(a_AU, e, ma_ref, n, nu_factor, rotation, ref_epoch_jd, times_jd):
+    """
+    orbit_xyz_vectorized for re-epoched orbits (see element_invariants):
+    a Kepler solve plus the (3x2) rotation, no trig of fixed angles.
+    Either one orbit (scalars, rotation (3, 2)) at many times, or one time
+    per orbit (arrays of length N, rotation (N, 3, 2)).
+    Returns arrays X,Y,Z (AU) and r.
+    """
+    M = (ma_ref + n * (times_jd - ref_epoch_jd)) % (2*np.pi)
+
+    E = solve_kepler_vec(M, e)
+    half = E / 2
+    nu = 2 * np.arctan2(nu_factor * np.sin(half), np.cos(half))
+    r = a_AU * (1 - e * np.cos(E))
+
+    x_orb = r * np.cos(nu)
+    y_orb = r * np.sin(nu)
+    rotation = np.asarray(rotation)
+    X = rotation[..., 0, 0] * x_orb + rotation[..., 0, 1] * y_orb
+    Y = rotation[..., 1, 0] * x_orb + rotation[..., 1, 1] * y_orb
+    Z = rotation[..., 2, 0] * x_orb + rotation[..., 2, 1] * y_orb
+    return X, Y, Z, r
+
 def earth_heliocentric_positions(times_jd):
     """
     Very fast Kepler approx for Earth's heliocentric position on times_jd (1D array).
@@ -141,14 +204,13 @@ def compute_radec_alt_for_vector(X, Y, Z, earth_xyz, times, location):
     return np.rad2deg(ra), np.rad2deg(dec), np.rad2deg(alt), np.rad2deg(elong)
 
 # ---------- DETEKCJA OKIEN (wektorowo) ----------
-def detect_windows_from_mask(mask, times):
+def window_indices_from_mask(mask):
     """
     mask: boolean 1D array
-    times: astropy Time array (same length)
-    Returns list of (start_time_iso, end_time_iso, start_idx, end_idx)
+    Returns (starts, ends): int arrays of first/last index of every True run.
     """
     if mask.size == 0:
-        return []
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
     diff = np.diff(mask.astype(np.int8))
     starts = np.where(diff == 1)[0] + 1
     ends = np.where(diff == -1)[0]
@@ -157,42 +219,148 @@ def detect_windows_from_mask(mask, times):
         starts = np.r_[0, starts]
     if mask[-1]:
         ends = np.r_[ends, mask.size-1]
+    return starts, ends
 
+def detect_windows_from_mask(mask, times):
+    """
+    mask: boolean 1D array
+    times: astropy Time array (same length)
+    Returns list of (start_time_iso, end_time_iso, start_idx, end_idx)
+    """
+    starts, ends = window_indices_from_mask(mask)
     windows = []
     for s, e in zip(starts, ends):
         windows.append((times[s].iso, times[e].iso, int(s), int(e)))
     return windows
 
 # ---------- SZYBKA FUNKCJA DLA JEDNEGO OBIEKTU (wewnętrzna) ----------
-def _process_one_object(orb, times, times_jd, earth_xyz, location,
-                        min_alt, min_elong):
+def _object_name(orb):
+    return orb.get("name", orb.get("designation", "unnamed"))
+
+def _object_geometry(orb, times_jd, frame):
     """
     orb: dict with keys: name,a,e,i,om,w,ma,epoch
-    returns name -> windows list (each: dict)
+    times_jd, frame: one time chunk of the request grid, see _iter_chunks
+    returns (ra_deg, dec_deg, alt_deg, elong_deg) per-sample arrays in
+    frame.dtype, or None on bad parameters. The arrays are the calling
+    thread's reusable buffers: index/copy them before the thread handles
+    the next object.
     """
-    name = orb.get("name", orb.get("designation", "unnamed"))
     try:
-        X, Y, Z, r = orbit_xyz_vectorized(float(orb["a"]), float(orb["e"]),
-                                          float(orb["i"]), float(orb["om"]),
-                                          float(orb["w"]), float(orb["ma"]),
-                                          float(orb["epoch"]), times_jd)
+        # propagation always in float64
+        if "rotation" in orb:
+            # re-epoched snapshot row (integrations.elements)
+            X, Y, Z, r = orbit_xyz_from_invariants(orb["a"], orb["e"], orb["ma_ref"], orb["n"],
+                                                   orb["nu_factor"], orb["rotation"],
+                                                   orb["epoch"], times_jd)
+        else:
+            X, Y, Z, r = orbit_xyz_vectorized(float(orb["a"]), float(orb["e"]),
+                                              float(orb["i"]), float(orb["om"]),
+                                              float(orb["w"]), float(orb["ma"]),
+                                              float(orb["epoch"]), times_jd)
     except Exception as exc:
         # if any problem with params, return empty
-        return name, []
+        return None
 
-    ra_deg, dec_deg, alt_deg, elong_deg = compute_radec_alt_for_vector(X, Y, Z, earth_xyz, times, location)
+    return compute_radec_alt_fast(X, Y, Z, frame)
+
+def _object_windows(orb, times_jd, frame, min_alt, min_elong):
+    """
+    orb: dict with keys: name,a,e,i,om,w,ma,epoch
+    returns (ra_start, dec_start, starts, ends) where starts/ends are the
+    window index arrays (into times_jd) and ra/dec_start the coordinates
+    at each start, or None when the object has no window (or bad parameters)
+    """
+    geometry = _object_geometry(orb, times_jd, frame)
+    if geometry is None:
+        return None
+    ra_deg, dec_deg, alt_deg, elong_deg = geometry
 
     # mask criteria (tuneable)
     mask = (alt_deg >= min_alt) & (elong_deg >= min_elong)
 
-    windows_raw = detect_windows_from_mask(mask, times)
-    if not windows_raw:
-        return []
-    windows_out = []
-    for start_iso, end_iso, si, ei in windows_raw:
-        a = SBO(name = name, latitude = float(ra_deg[si]), longitude = float(dec_deg[si]), begin_time = start_iso, end_time = end_iso)
-        windows_out.append(a)
-    return  windows_out
+    starts, ends = window_indices_from_mask(mask)
+    if starts.size == 0:
+        return None
+    return ra_deg[starts], dec_deg[starts], starts, ends
+
+def _merge_window_pieces(pieces):
+    """
+    pieces: (ra_start, dec_start, starts, ends) of consecutive time chunks,
+    indices already global. A window ending on the last sample of a chunk
+    and one starting on the first sample of the next are the same window.
+    """
+    ra_start = np.concatenate([p[0] for p in pieces])
+    dec_start = np.concatenate([p[1] for p in pieces])
+    starts = np.concatenate([p[2] for p in pieces])
+    ends = np.concatenate([p[3] for p in pieces])
+    joined = starts[1:] == ends[:-1] + 1
+    keep_start = np.r_[True, ~joined]
+    keep_end = np.r_[~joined, True]
+    return ra_start[keep_start], dec_start[keep_start], starts[keep_start], ends[keep_end]
+
+def _grid_size(start_time, end_time, cadence_min):
+    """
+    (t0, t1, step, n): bounds and step (JD, days) of make_time_grid() and its
+    number of samples, without building the grid.
+    """
+    from astropy.time import Time
+    t0 = Time(start_time).jd
+    t1 = Time(end_time).jd
+    step = cadence_min / (24*60)
+    # długość np.arange(t0, t1 + 1e-12, step)
+    n = max(int(np.ceil((t1 + 1e-12 - t0) / step)), 0)
+    return t0, t1, step, n
+
+def _prepare_grid(objects, start_time, end_time, cadence_min, max_workers, precision, memory_budget,
+                  retained_bytes_per_sample=0):
+    """
+    Plan the request before allocating anything of its size.
+    Returns (times_jd, plan); the times equal make_time_grid(...).jd.
+    Raises MemoryBudgetExceeded (planner) when the time range is too long.
+    """
+    t0, t1, step, n_times = _grid_size(start_time, end_time, cadence_min)
+    plan = plan_execution(len(objects), n_times, max_workers=max_workers,
+                          memory_budget=memory_budget, precision=precision,
+                          retained_bytes_per_sample=retained_bytes_per_sample)
+    times_jd = np.arange(t0, t1 + 1e-12, step)
+    return times_jd, plan
+
+def _observer_site(observer_lat, observer_lon, observer_elev_m):
+    """(lat, lon) in degrees of the observer, as the reference path reads them from EarthLocation."""
+    from astropy.coordinates import EarthLocation
+    import astropy.units as u
+    location = EarthLocation(lat=observer_lat*u.deg, lon=observer_lon*u.deg, height=observer_elev_m*u.m)
+    return location.lat.value, location.lon.value
+
+def _chunk_frame(times_jd, site, dtype):
+    """TopocentricFrame (Earth vectors, LST, sin/cos latitude, |Earth|) of one time chunk."""
+    return TopocentricFrame(earth_heliocentric_positions(times_jd), times_jd, *site, dtype)
+
+def _iter_chunks(objects, times_jd, site, plan):
+    """
+    Split the request by the ExecutionPlan: yields
+    (object_batch, time_offset, (times_jd, frame) of the time chunk)
+    with all time chunks of one object batch before the next batch.
+    Earth vectors are computed per time chunk, never for the whole range;
+    a single chunk's frame is shared by all batches.
+    """
+    n = times_jd.size
+    bounds = [(t0, min(t0 + plan.times_per_chunk, n)) for t0 in range(0, n, plan.times_per_chunk)]
+    shared = _chunk_frame(times_jd, site, plan.dtype) if len(bounds) == 1 else None
+    for first in range(0, len(objects), plan.objects_per_chunk):
+        batch = objects[first:first + plan.objects_per_chunk]
+        for t0, t1 in bounds:
+            chunk = times_jd[t0:t1]
+            frame = shared if shared is not None else _chunk_frame(chunk, site, plan.dtype)
+            yield batch, t0, (chunk, frame)
+
+def _map_objects(exe, func, objects, grid, *args):
+    """
+    Run func(obj, times_jd, frame, *args) for every object on the executor;
+    yields results in the order of objects.
+    """
+    return exe.map(lambda obj: func(obj, *grid, *args), objects)
 
 # ---------- FUNKCJA BATCH (publiczna) ----------
 def visibility_for_many(objects,
@@ -201,7 +369,9 @@ def visibility_for_many(objects,
                         cadence_min=10,
                         min_alt_deg=5.0,
                         min_elong_deg=10.0,
-                        max_workers=8):
+                        max_workers=8,
+                        precision="float64",
+                        memory_budget=DEFAULT_MEMORY_BUDGET):
     """
     objects: list of dicts. Required keys: name,a,e,i,om,w,ma,epoch
              a [AU], e, i/om/w/ma in degrees, epoch in JD
@@ -212,43 +382,320 @@ def visibility_for_many(objects,
     min_alt_deg: minimal altitude to consider visible
     min_elong_deg: minimal solar elongation
     max_workers: number of threads for parallel processing
+    precision: "float64" or "float32" for the topocentric/elongation stage
+               (propagation is always float64)
+    memory_budget: bytes; objects and times are chunked to fit (see planner),
+                   MemoryBudgetExceeded if the time range alone does not fit
 
-    Returns: dict mapping object name -> list of windows (each a dict).
+    Returns: list of SBO windows.
              Objects with empty windows are omitted.
     """
-    # time grid
-    times = make_time_grid(start_time, end_time, cadence_min)
-    times_jd = times.jd  # numpy array
-    # earth positions once
-    earth_xyz = earth_heliocentric_positions(times_jd)  # shape (3, N)
-
-    # observer location
-    location = EarthLocation(lat=observer_lat*u.deg, lon=observer_lon*u.deg, height=observer_elev_m*u.m)
-
-    results = []
-
-    # for obj in objects:
-    #     windows = _process_one_object(obj, times, times_jd, earth_xyz, location,
-    #                                   min_alt_deg, min_elong_deg)
-    #     if windows:  # only keep objects that have at least one window
-    #         results.extend(windows)
+    columns = visibility_columns_for_many(objects, start_time, end_time,
+                                          observer_lat, observer_lon, observer_elev_m,
+                                          cadence_min=cadence_min,
+                                          min_alt_deg=min_alt_deg,
+                                          min_elong_deg=min_elong_deg,
+                                          max_workers=max_workers,
+                                          precision=precision,
+                                          memory_budget=memory_budget)
+    return [SBO(**row) for row in columns_to_rows(columns)]
+
+# ---------- WYNIKI KOLUMNOWE ----------
+# Kolumny zwracane przez visibility_columns_for_many(); latitude/longitude
+# mają to samo znaczenie co pola SBO (RA/Dec na początku okna, w stopniach).
+VISIBILITY_COLUMNS = ("name", "latitude", "longitude", "begin_jd", "end_jd")
+
+def visibility_columns_for_many(objects,
+                                start_time, end_time,
+                                observer_lat, observer_lon, observer_elev_m=0,
+                                cadence_min=10,
+                                min_alt_deg=5.0,
+                                min_elong_deg=10.0,
+                                max_workers=8,
+                                precision="float64",
+                                memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Same computation as visibility_for_many, but returns the windows as
+    columns instead of SBO instances:
+      {"name": list of str,
+       "latitude", "longitude": float arrays (deg, dtype of `precision`),
+       "begin_jd", "end_jd": float64 arrays (JD, UTC)}
+    One entry per window, in the order of objects; no per-row objects or
+    ISO strings are built.
+    """
+    times_jd, plan = _prepare_grid(objects, start_time, end_time, cadence_min,
+                                   max_workers, precision, memory_budget)
+    site = _observer_site(observer_lat, observer_lon, observer_elev_m)
+
+    names, lat, lon, begin, end = [], [], [], [], []
+
+    def flush(batch, pieces):
+        for orb, obj_pieces in zip(batch, pieces):
+            if not obj_pieces:
+                continue
+            ra_start, dec_start, starts, ends = _merge_window_pieces(obj_pieces)
+            names.extend([_object_name(orb)] * starts.size)
+            lat.append(ra_start)
+            lon.append(dec_start)
+            begin.append(times_jd[starts])
+            end.append(times_jd[ends])
+
+    batch, pieces = None, None
+    with ThreadPoolExecutor(max_workers=max_workers) as exe:
+        for chunk_batch, t0, chunk in _iter_chunks(objects, times_jd, site, plan):
+            if chunk_batch is not batch:
+                if batch is not None:
+                    flush(batch, pieces)
+                batch, pieces = chunk_batch, [[] for _ in chunk_batch]
+            found_all = _map_objects(exe, _object_windows, chunk_batch, chunk,
+                                     min_alt_deg, min_elong_deg)
+            for obj_pieces, found in zip(pieces, found_all):
+                if found is not None:
+                    ra_start, dec_start, starts, ends = found
+                    obj_pieces.append((ra_start, dec_start, starts + t0, ends + t0))
+        if batch is not None:
+            flush(batch, pieces)
+
+    def cat(parts):
+        return np.concatenate(parts) if parts else np.empty(0)
+
+    return {"name": names, "latitude": cat(lat), "longitude": cat(lon),
+            "begin_jd": cat(begin), "end_jd": cat(end)}
+
+def _angle_list(values):
+    """
+    Column of angles as Python floats. float32 columns go through their
+    shortest decimal repr, so 0.1 stays 0.1 and not 0.10000000149011612.
+    """
+    values = np.asarray(values)
+    if values.dtype == np.float32:
+        values = values.astype(str).astype(np.float64)
+    return values.tolist()
 
+def columns_to_rows(columns):
+    """
+    Turn visibility columns into the list-of-dicts shape of SBO.to_dict()
+    (begin_time/end_time as astropy ISO strings), converting all
+    timestamps in one vectorized call.
+    """
+    from astropy.time import Time
+    n = len(columns["name"])
+    if n == 0:
+        return []
+    iso = Time(np.concatenate([columns["begin_jd"], columns["end_jd"]]), format='jd').iso
+    return [
+        {"name": name, "latitude": lat, "longitude": lon,
+         "begin_time": begin, "end_time": end}
+        for name, lat, lon, begin, end in zip(columns["name"],
+                                              _angle_list(columns["latitude"]),
+                                              _angle_list(columns["longitude"]),
+                                              iso[:n].tolist(), iso[n:].tolist())
+    ]
+
+# ---------- TRAJEKTORIE ----------
+def douglas_peucker_indices(x, y, tolerance, z=None):
+    """
+    Ramer-Douglas-Peucker simplification of the polyline (x, y).
+    Returns sorted indices of the points to keep (always first and last).
+    z: optional extra series (per sample) whose linear interpolation between
+    kept samples must also stay within tolerance of every dropped sample.
+    tolerance <= 0 keeps every point.
+    """
+    n = x.size
+    if n <= 2 or tolerance <= 0:
+        return np.arange(n)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        s, e = stack.pop()
+        if e - s < 2:
+            continue
+        dx = x[e] - x[s]
+        dy = y[e] - y[s]
+        px = x[s+1:e] - x[s]
+        py = y[s+1:e] - y[s]
+        seg = np.hypot(dx, dy)
+        if seg == 0.0:
+            dist = np.hypot(px, py)
+        else:
+            dist = np.abs(dx * py - dy * px) / seg
+        if z is not None:
+            # pionowy błąd interpolacji liniowej po numerze próbki
+            frac = np.arange(1, e - s) / (e - s)
+            dist = np.maximum(dist, np.abs(z[s+1:e] - (z[s] + (z[e] - z[s]) * frac)))
+        k = int(np.argmax(dist))
+        if dist[k] > tolerance:
+            m = s + 1 + k
+            keep[m] = True
+            stack.append((s, m))
+            stack.append((m, e))
+    return np.flatnonzero(keep)
+
+def simplify_sky_track(ra_deg, dec_deg, alt_deg, tolerance_deg):
+    """
+    Douglas-Peucker on the RA/Dec track: RA is unwrapped across 0/360 and
+    scaled by cos(dec) so that tolerance_deg is roughly an angle on the sky.
+    Altitude interpolated between the kept samples also stays within
+    tolerance_deg, so rises and sets survive the simplification.
+    """
+    ra_unwrapped = np.rad2deg(np.unwrap(np.deg2rad(ra_deg)))
+    x = ra_unwrapped * np.cos(np.deg2rad(dec_deg))
+    return douglas_peucker_indices(x, dec_deg, tolerance_deg, z=alt_deg)
 
-    # parallel map
-    with ThreadPoolExecutor(max_workers=max_workers) as exe:
-        futures = [exe.submit(_process_one_object, obj, times, times_jd, earth_xyz, location, min_alt_deg, min_elong_deg)
-                   for obj in objects]
-        for fut in as_completed(futures):
-            windows = fut.result()
-            if windows:  # only keep objects that have at least one window
-                results.extend(windows)
-    return results
-
-def fetch_sbdb_objects(limit):
+def _object_samples(orb, times_jd, frame, min_alt, min_elong):
+    """
+    One time chunk of an object's track: (ra, dec, alt) copies and whether
+    the object is visible in the chunk (always True unless both min_alt and
+    min_elong are given). None on bad parameters.
+    """
+    geometry = _object_geometry(orb, times_jd, frame)
+    if geometry is None:
+        return None
+    ra_deg, dec_deg, alt_deg, elong_deg = geometry
+    visible = True
+    if min_alt is not None and min_elong is not None:
+        visible = bool(np.any((alt_deg >= min_alt) & (elong_deg >= min_elong)))
+    return ra_deg.copy(), dec_deg.copy(), alt_deg.copy(), visible
+
+def _object_track(orb, pieces, tolerance_deg):
+    """
+    Sampled track of one object from the _object_samples() of all time
+    chunks, in order: dict with name and index/ra/dec/alt arrays (index
+    into the request grid). None on bad parameters (also non-finite
+    samples, e.g. e >= 1 from the live SBDB) or if the object is visible
+    in no chunk. Simplified once, over the whole range.
+    """
+    if not pieces or any(piece is None for piece in pieces):
+        return None
+    if not any(piece[3] for piece in pieces):
+        return None
+    ra_deg, dec_deg, alt_deg = (np.concatenate([piece[k] for piece in pieces]) for k in range(3))
+    if not (np.isfinite(ra_deg).all() and np.isfinite(dec_deg).all()
+            and np.isfinite(alt_deg).all()):
+        return None
+    index = simplify_sky_track(ra_deg, dec_deg, alt_deg, tolerance_deg)
+    return {"name": _object_name(orb), "index": index,
+            "ra": ra_deg[index], "dec": dec_deg[index], "alt": alt_deg[index]}
+
+def _track_bytes_per_sample(precision):
+    # ra/dec/alt of every sample, held until the object batch is done, + index
+    return 8 + 3 * np.dtype(precision_dtype(precision)).itemsize
+
+def tracks_for_many(objects,
+                    start_time, end_time,
+                    observer_lat, observer_lon, observer_elev_m=0,
+                    cadence_min=10,
+                    min_alt_deg=None,
+                    min_elong_deg=None,
+                    tolerance_deg=0.0,
+                    max_workers=8,
+                    precision="float64",
+                    memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Sampled RA/Dec/alt tracks for many objects on one time grid.
+    min_alt_deg/min_elong_deg: if both given, skip objects never visible
+    tolerance_deg: Douglas-Peucker tolerance on the sky track and on alt
+                   (0 = all samples)
+    precision, memory_budget: as in visibility_for_many; the budget also
+    bounds the samples of an object batch held until its tracks are built
+
+    Returns (times_jd, tracks) where tracks is a generator of dicts
+    {"name", "index", "ra", "dec", "alt"}, one per object, in the order of
+    objects; sample k is at times_jd[index[k]]. Time chunks of an object are
+    joined before the visibility filter and the simplification.
+    """
+    times_jd, plan = _prepare_grid(objects, start_time, end_time, cadence_min,
+                                   max_workers, precision, memory_budget,
+                                   _track_bytes_per_sample(precision))
+    site = _observer_site(observer_lat, observer_lon, observer_elev_m)
+
+    def generate():
+        with ThreadPoolExecutor(max_workers=max_workers) as exe:
+
+            def finish(batch, pieces):
+                tracks = exe.map(lambda item: _object_track(*item, tolerance_deg),
+                                 zip(batch, pieces))
+                return (track for track in tracks if track is not None)
+
+            batch, pieces = None, None
+            for chunk_batch, t0, chunk in _iter_chunks(objects, times_jd, site, plan):
+                if chunk_batch is not batch:
+                    if batch is not None:
+                        yield from finish(batch, pieces)
+                    batch, pieces = chunk_batch, [[] for _ in chunk_batch]
+                found_all = _map_objects(exe, _object_samples, chunk_batch, chunk,
+                                         min_alt_deg, min_elong_deg)
+                for obj_pieces, found in zip(pieces, found_all):
+                    obj_pieces.append(found)
+            if batch is not None:
+                yield from finish(batch, pieces)
+
+    return times_jd, generate()
+
+# ---------- POZYCJE W JEDNEJ CHWILI (mapa nieba) ----------
+ORBIT_KEYS = ("a", "e", "i", "om", "w", "ma", "epoch")
+
+def positions_at(objects, time,
+                 observer_lat, observer_lon, observer_elev_m=0,
+                 precision="float64"):
+    """
+    Positions of all objects at a single instant, vectorized over objects
+    (one Kepler solve and one topocentric transform for the whole catalog).
+    Re-epoched snapshot rows (integrations.elements) use their invariants.
+    Objects with bad parameters are skipped.
+
+    Returns columns {"name": list of str, "ra", "dec", "alt", "az", "elong":
+    arrays (deg)}, in the order of objects, and the JD of the instant as
+    (columns, jd).
+    """
+    from astropy.time import Time
+    times_jd = np.array([Time(time).jd])
+    frame = _chunk_frame(times_jd, _observer_site(observer_lat, observer_lon, observer_elev_m),
+                         precision_dtype(precision))
+    names, elements, snapshot_rows, from_snapshot = [], [], [], []
+    for orb in objects:
+        if "rotation" in orb:
+            snapshot_rows.append(orb)
+        else:
+            try:
+                elements.append([float(orb[key]) for key in ORBIT_KEYS])
+            except (KeyError, TypeError, ValueError):
+                continue
+        from_snapshot.append("rotation" in orb)
+        names.append(_object_name(orb))
+    from_snapshot = np.array(from_snapshot, dtype=bool)
+    n = len(names)
+
+    # propagation to the instant, the two kinds of rows separately
+    X, Y, Z = np.empty((3, n))
+    if elements:
+        elements = np.array(elements, dtype=np.float64)
+        X[~from_snapshot], Y[~from_snapshot], Z[~from_snapshot], _ = orbit_xyz_vectorized(
+            *elements.T, np.repeat(times_jd, len(elements)))
+    if snapshot_rows:
+        invariants = [np.array([orb[key] for orb in snapshot_rows], dtype=np.float64)
+                      for key in ("a", "e", "ma_ref", "n", "nu_factor", "rotation", "epoch")]
+        X[from_snapshot], Y[from_snapshot], Z[from_snapshot], _ = orbit_xyz_from_invariants(
+            *invariants, np.repeat(times_jd, len(snapshot_rows)))
+
+    # the single sample repeated per object: frame "samples" are now objects
+    frame = frame.repeat(n)
+    ra_deg, dec_deg, alt_deg, elong_deg = (row.copy() for row in compute_radec_alt_fast(X, Y, Z, frame))
+    return {"name": names, "ra": ra_deg, "dec": dec_deg, "alt": alt_deg,
+            "az": azimuth_deg(ra_deg, dec_deg, frame), "elong": elong_deg}, float(times_jd[0])
+
+def fetch_sbdb_objects(limit, names=None):
+    import requests
+    from django.conf import settings
     url = (
-        "https://ssd-api.jpl.nasa.gov/sbdb_query.api?"
+        f"{settings.SBDB_QUERY_URL}?"
         f"fields=name,a,e,i,om,w,ma,epoch&sb-kind=a&limit={limit}"
     )
+    if names:
+        # filtr po stronie SBDB, żeby limit liczył tylko pasujące obiekty
+        constraint = json.dumps({"OR": [f"name|EQ|{name}" for name in names]})
+        url += f"&sb-cdata={quote(constraint)}"
     data = requests.get(url).json()
     fields = data["fields"]
 
@@ -258,15 +705,116 @@ def fetch_sbdb_objects(limit):
         objects.append(entry)
     return objects
 
+def query_objects(limit, names=None):
+    """
+    Catalog for view queries: the re-epoched snapshot (integrations.elements)
+    when one has been built, otherwise a live SBDB query.
+    names: keep only objects with these names; filtered before limit, so
+    limit counts matching objects.
+    """
+    from integrations.elements import snapshot_objects
+    objects = snapshot_objects()
+    if objects is None:
+        objects = fetch_sbdb_objects(limit, names)
+    if names:
+        wanted = set(names)
+        objects = [obj for obj in objects if obj.get("name") in wanted]
+    return objects[:limit]
+
+# progi używane przez zapytania z widoków (events)
+QUERY_CADENCE_MIN = 10
+QUERY_MIN_ALT_DEG = 10.0
+QUERY_MIN_ELONG_DEG = 22.0
+QUERY_MAX_WORKERS = 8
+
+def query_engine_options():
+    """precision / memory_budget for view queries, from Django settings."""
+    from django.conf import settings
+    return {
+        "precision": getattr(settings, "INTEGRATIONS_PRECISION", "float64"),
+        "memory_budget": int(getattr(settings, "INTEGRATIONS_MEMORY_BUDGET_MB",
+                                     DEFAULT_MEMORY_BUDGET // 2**20) * 2**20),
+    }
+
+def _check_query_size(begin_time, end_time, limit, retained_bytes_per_sample=0):
+    """
+    MemoryBudgetExceeded for a too long time range before the catalog is
+    fetched; the engine plans again with the actual catalog.
+    """
+    options = query_engine_options()
+    n_times = _grid_size(begin_time, end_time, QUERY_CADENCE_MIN)[3]
+    plan_execution(limit, n_times, max_workers=QUERY_MAX_WORKERS,
+                   retained_bytes_per_sample=retained_bytes_per_sample, **options)
+
 def get_query_sbo(latitude, longitude, begin_time, end_time, elevation=100, limit=100):
-    objects = fetch_sbdb_objects(limit)
+    _check_query_size(begin_time, end_time, limit)
+    objects = query_objects(limit)
     res = visibility_for_many(objects,
                               start_time=begin_time,
                               end_time=end_time,
                               observer_lat=latitude, observer_lon=longitude, observer_elev_m=elevation,
-                              cadence_min=10,
-                              min_alt_deg=10.0,
-                              min_elong_deg=22.0,
-                              max_workers=8)
+                              cadence_min=QUERY_CADENCE_MIN,
+                              min_alt_deg=QUERY_MIN_ALT_DEG,
+                              min_elong_deg=QUERY_MIN_ELONG_DEG,
+                              max_workers=QUERY_MAX_WORKERS,
+                              **query_engine_options())
     sbo_list_dict = [obj.to_dict() for obj in res]
-    return sbo_list_dict
\ No newline at end of file
+    return sbo_list_dict
+
+def get_query_sbo_columns(latitude, longitude, begin_time, end_time, elevation=100, limit=100):
+    """Columnar variant of get_query_sbo (see visibility_columns_for_many)."""
+    _check_query_size(begin_time, end_time, limit)
+    objects = query_objects(limit)
+    return visibility_columns_for_many(objects,
+                                       start_time=begin_time,
+                                       end_time=end_time,
+                                       observer_lat=latitude, observer_lon=longitude, observer_elev_m=elevation,
+                                       cadence_min=QUERY_CADENCE_MIN,
+                                       min_alt_deg=QUERY_MIN_ALT_DEG,
+                                       min_elong_deg=QUERY_MIN_ELONG_DEG,
+                                       max_workers=QUERY_MAX_WORKERS,
+                                       **query_engine_options())
+
+def get_query_tracks(latitude, longitude, begin_time, end_time, names=None,
+                     visible_only=True, tolerance_deg=0.0, elevation=100, limit=100):
+    """
+    Sampled tracks (see tracks_for_many) for the SBDB objects, optionally
+    restricted to the given names.
+    """
+    _check_query_size(begin_time, end_time, limit,
+                      _track_bytes_per_sample(query_engine_options()["precision"]))
+    objects = query_objects(limit, names)
+    return tracks_for_many(objects,
+                           start_time=begin_time,
+                           end_time=end_time,
+                           observer_lat=latitude, observer_lon=longitude, observer_elev_m=elevation,
+                           cadence_min=QUERY_CADENCE_MIN,
+                           min_alt_deg=QUERY_MIN_ALT_DEG if visible_only else None,
+                           min_elong_deg=QUERY_MIN_ELONG_DEG if visible_only else None,
+                           tolerance_deg=tolerance_deg,
+                           max_workers=QUERY_MAX_WORKERS,
+                           **query_engine_options())
+
+
+# ---------- ROZGRZEWANIE (start workera) ----------
+_warmed_up = False
+
+def warm_up():
+    """
+    Import astropy and run one tiny visibility computation so that the first
+    real request does not pay for lazy imports and astropy's initialization
+    (Time scales, ERFA, EarthLocation). Safe to call many times; does no
+    network I/O. Call it at worker boot (webapp/wsgi.py, webapp/asgi.py).
+    """
+    global _warmed_up
+    if _warmed_up:
+        return
+    probe = [{"name": "warm-up", "a": 2.77, "e": 0.08, "i": 10.6, "om": 80.3,
+              "w": 73.6, "ma": 77.4, "epoch": 2451545.0}]
+    kwargs = dict(start_time="2000-01-01 00:00:00", end_time="2000-01-01 02:00:00",
+                  observer_lat=52.0, observer_lon=21.0,
+                  cadence_min=60, min_alt_deg=-90.0, min_elong_deg=0.0,
+                  max_workers=1)
+    [obj.to_dict() for obj in visibility_for_many(probe, **kwargs)]
+    columns_to_rows(visibility_columns_for_many(probe, **kwargs))
+    _warmed_up = True
@@ -14,3 +14,11 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'webapp.settings')
 
 application = get_asgi_application()
+
+# Rozgrzanie silnika widoczności przy starcie workera, żeby pierwsze zapytanie
+# nie płaciło za leniwe importy astropy.
+from django.conf import settings
+
+if getattr(settings, 'INTEGRATIONS_WARM_UP', True):
+    from integrations.views import warm_up
+    warm_up()
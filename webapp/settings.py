@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -82,7 +83,7 @@ WSGI_APPLICATION = 'webapp.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('SKYMAP_DB_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
@@ -127,6 +128,24 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+# Caches
+# "skymap" holds the sky positions and tiles of the sky map (events/tiles.py);
+# LocMemCache evicts least recently used entries beyond MAX_ENTRIES.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'skymap': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'skymap-tiles',
+        'TIMEOUT': 3600,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -159,4 +178,20 @@ REST_FRAMEWORK = {
     ),
 }
 
+# Run integrations.views.warm_up() when the WSGI/ASGI worker boots
+INTEGRATIONS_WARM_UP = True
+
+# Visibility engine: "float64" or "float32" for the topocentric stage
+# (propagation stays float64), and the per-request memory budget used to
+# chunk objects x times (integrations/planner.py)
+INTEGRATIONS_PRECISION = "float64"
+INTEGRATIONS_MEMORY_BUDGET_MB = 256
+
+# Re-epoched element catalog written by `manage.py reepoch_elements`;
+# view queries use it instead of a live SBDB query once it exists
+INTEGRATIONS_ELEMENT_SNAPSHOT = os.environ.get('SKYMAP_ELEMENT_SNAPSHOT', BASE_DIR / 'element_snapshot.npz')
+
+# JPL SBDB query API; overridden by the load-test harness to point at its stub
+SBDB_QUERY_URL = os.environ.get('SBDB_QUERY_URL', "https://ssd-api.jpl.nasa.gov/sbdb_query.api")
+
 NASA_API_KEY = "TU_WSTAW_SWÓJ_PRAWDZIWY_KLUCZ_API"
\ No newline at end of file
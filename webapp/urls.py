@@ -17,7 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from main.views import login_view
-from events.views import events_view
+from events.views import events_view, tile_view, tracks_view
 
 
 urlpatterns = [
@@ -25,6 +25,8 @@ urlpatterns = [
     path('', include('main.urls')),
     path('api/', include('api.urls')),
     path('events/', events_view, name='events'),
+    path('events/tracks/', tracks_view, name='tracks'),
+    path('events/tiles/<str:projection>/<int:z>/<int:x>/<int:y>/', tile_view, name='tiles'),
 
     
 ]